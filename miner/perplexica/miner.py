@@ -10,6 +10,7 @@ import requests
 
 from dotenv import load_dotenv
 
+from shared.blacklist import build_blacklist_lookups, is_blacklisted
 from shared.log_data import LoggerType
 from shared.proxy_log_handler import register_proxy_log_handler
 from shared.veridex_protocol import VericoreSynapse, SourceEvidence
@@ -19,6 +20,7 @@ bt.logging.set_trace()
 
 load_dotenv()
 
+
 class Miner:
     def __init__(self):
         self.config = self.get_config()
@@ -90,52 +92,15 @@ class Miner:
             )
             bt.logging.info(f"Miner on uid: {self.my_subnet_uid}")
 
-    def blacklist_fn(self, synapse: VericoreSynapse) -> Tuple[bool, str]:
-        # First check if hotkey is in metagraph
-        if synapse.dendrite.hotkey not in self.metagraph.hotkeys:
-            bt.logging.trace(
-                f"Blacklisting unrecognized hotkey {synapse.dendrite.hotkey}"
-            )
-            return True, None
+        self.refresh_blacklist_lookups()
 
-        # Get the neuron info to check validator_permit
-        try:
-            neuron_uid = self.metagraph.hotkeys.index(synapse.dendrite.hotkey)
-            neuron = self.metagraph.neurons[neuron_uid]
-
-            # Only accept requests from validators (not miners)
-            # This prevents attackers from registering as miners and spoofing validator requests
-            if not neuron.validator_permit:
-                bt.logging.warning(
-                    f"Blacklisting non-validator hotkey {synapse.dendrite.hotkey} (uid: {neuron_uid})"
-                )
-                return True, None
-
-            # Reject validators with no axon_info or not serving (Bittensor SDK: invalid IP e.g. 0.0.0.0)
-            if neuron.axon_info is None:
-                bt.logging.warning(
-                    f"Blacklisting validator {synapse.dendrite.hotkey} (uid: {neuron_uid}): no axon_info"
-                )
-                return True, None
-            if not neuron.axon_info.is_serving:
-                bt.logging.warning(
-                    f"Blacklisting validator {synapse.dendrite.hotkey} (uid: {neuron_uid}): axon not serving (invalid IP)"
-                )
-                return True, None
-
-            # Note: The metagraph is synced periodically in the main loop (every 60 steps)
-            # to ensure validator_permit status is up-to-date. For additional security,
-            # you can also whitelist validator IPs at the network/firewall level.
-
-            bt.logging.trace(
-                f"Accepting request from validator hotkey {synapse.dendrite.hotkey} (uid: {neuron_uid})"
-            )
-            return False, None
-        except (ValueError, IndexError) as e:
-            bt.logging.error(
-                f"Error validating hotkey {synapse.dendrite.hotkey}: {e}. Blacklisting for safety."
-            )
-            return True, None
+    def refresh_blacklist_lookups(self):
+        """Rebuild the blacklist_fn lookup tables from the metagraph. Call after every metagraph.sync()."""
+        # One tuple assigned in a single step, so blacklist_fn never sees a mismatched pair
+        self.blacklist_lookups = build_blacklist_lookups(self.metagraph)
+
+    def blacklist_fn(self, synapse: VericoreSynapse) -> Tuple[bool, str]:
+        return is_blacklisted(self.metagraph, synapse.dendrite.hotkey, self.blacklist_lookups)
 
     def veridex_forward(self, synapse: VericoreSynapse) -> VericoreSynapse:
         """
@@ -293,6 +258,7 @@ Response MUST returned as a json array. If it isn't returned as json object the
             try:
                 if step % 60 == 0:
                     self.metagraph.sync()
+                    self.refresh_blacklist_lookups()
                     log = (
                         f"Block: {self.metagraph.block.item()} | "
                         f"Incentive: {self.metagraph.I[self.my_subnet_uid]} | "
@@ -0,0 +1,87 @@
+from typing import Dict, FrozenSet, Optional, Tuple
+
+import bittensor as bt
+
+# (hotkey -> UID, hotkeys that pass every blacklist check), built together from one metagraph sync
+BlacklistLookups = Tuple[Dict[str, int], FrozenSet[str]]
+
+
+def build_blacklist_lookups(metagraph) -> BlacklistLookups:
+    """Build the per-sync blacklist lookups: hotkey -> UID, and the hotkeys that pass every check."""
+    hotkey_to_uid = {hotkey: uid for uid, hotkey in enumerate(metagraph.hotkeys)}
+    # Hotkeys that pass every blacklist check: validator_permit and a serving axon
+    allowed_hotkeys = frozenset(
+        hotkey
+        for hotkey, neuron in zip(metagraph.hotkeys, metagraph.neurons)
+        if neuron.validator_permit
+        and neuron.axon_info is not None
+        and neuron.axon_info.is_serving
+    )
+    return hotkey_to_uid, allowed_hotkeys
+
+
+def is_blacklisted(
+    metagraph,
+    hotkey: str,
+    blacklist_lookups: Optional[BlacklistLookups] = None,
+) -> Tuple[bool, str]:
+    """Decide whether a request from hotkey is blacklisted, using only the metagraph.
+
+    Only hotkeys in allowed_hotkeys are accepted. blacklist_lookups is the (hotkey_to_uid, allowed_hotkeys) pair from build_blacklist_lookups();
+    it is built on the fly when not given.
+    """
+    hotkey_to_uid, allowed_hotkeys = blacklist_lookups or build_blacklist_lookups(metagraph)
+
+    # Fast path: accepted validators are precomputed on every metagraph sync
+    if hotkey in allowed_hotkeys:
+        bt.logging.trace(
+            f"Accepting request from validator hotkey {hotkey} (uid: {hotkey_to_uid.get(hotkey)})"
+        )
+        return False, None
+
+    # Every acceptable hotkey is in allowed_hotkeys, so anything else is blacklisted. The lookups and
+    # the live metagraph below are only used to pick the log message; the metagraph may already be
+    # newer than the lookups (between metagraph.sync() and refresh_blacklist_lookups()).
+    neuron_uid = hotkey_to_uid.get(hotkey)
+    if neuron_uid is None:
+        bt.logging.trace(
+            f"Blacklisting unrecognized hotkey {hotkey}"
+        )
+        return True, None
+
+    try:
+        neuron = metagraph.neurons[neuron_uid]
+    except (ValueError, IndexError) as e:
+        bt.logging.error(
+            f"Error validating hotkey {hotkey}: {e}. Blacklisting for safety."
+        )
+        return True, None
+
+    if getattr(neuron, "hotkey", hotkey) != hotkey:
+        # The UID was re-registered since the lookups were built
+        bt.logging.warning(
+            f"Blacklisting hotkey {hotkey} (uid: {neuron_uid}): uid now belongs to another hotkey"
+        )
+    elif not neuron.validator_permit:
+        # Only accept requests from validators (not miners)
+        # This prevents attackers from registering as miners and spoofing validator requests
+        bt.logging.warning(
+            f"Blacklisting non-validator hotkey {hotkey} (uid: {neuron_uid})"
+        )
+    elif neuron.axon_info is None:
+        # Reject validators with no axon_info or not serving (Bittensor SDK: invalid IP e.g. 0.0.0.0)
+        bt.logging.warning(
+            f"Blacklisting validator {hotkey} (uid: {neuron_uid}): no axon_info"
+        )
+    elif not neuron.axon_info.is_serving:
+        bt.logging.warning(
+            f"Blacklisting validator {hotkey} (uid: {neuron_uid}): axon not serving (invalid IP)"
+        )
+    else:
+        # Became a serving validator after the lookups were built; accepted after the next refresh.
+        # The metagraph is synced periodically in the main loop; for additional security,
+        # you can also whitelist validator IPs at the network/firewall level.
+        bt.logging.warning(
+            f"Blacklisting validator {hotkey} (uid: {neuron_uid}): not accepted as of the last metagraph sync"
+        )
+    return True, None
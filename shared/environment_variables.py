@@ -12,6 +12,21 @@ AI_API_URL = os.environ.get("AI_API_URL", "https://api.dashboard.vericore.dfusio
 USE_HTML_PARSER_API = os.environ.get("USE_HTML_PARSER_API", "False").lower() == 'true'
 HTML_PARSER_API_URL = os.environ.get("HTML_PARSER_API_URL", "https://api.snippet-fetcher.vericore.dfusion.ai")
 
+# Context similarity model; all validators should agree on it since scores differ between models.
+# sentence-transformers/all-MiniLM-L6-v2 is ~4x cheaper to encode but needs MIN_SNIPPET_CONTEXT_SIMILARITY_SCORE recalibrated
+CONTEXT_SIMILARITY_MODEL = os.environ.get("CONTEXT_SIMILARITY_MODEL", "sentence-transformers/all-mpnet-base-v2")
+# Context similarity encoder: "torch" (default) or "onnx-int8" (ONNX Runtime, int8 dynamic quantization; scores drift < 0.01)
+CONTEXT_SIMILARITY_BACKEND = os.environ.get("CONTEXT_SIMILARITY_BACKEND", "torch").lower()
+# torch.compile the context similarity encoder at startup (slower startup, faster steady-state forward)
+CONTEXT_SIMILARITY_COMPILE = os.environ.get("CONTEXT_SIMILARITY_COMPILE", "False").lower() == 'true'
+# Run the context similarity encoder in FP16 on CUDA (faster on tensor cores; scores move by ~1e-3, off by default)
+CONTEXT_SIMILARITY_FP16 = os.environ.get("CONTEXT_SIMILARITY_FP16", "False").lower() == 'true'
+CONTEXT_SIMILARITY_ONNX_DIR = os.environ.get("CONTEXT_SIMILARITY_ONNX_DIR", os.path.expanduser("~/.cache/vericore/context-similarity-onnx"))
+# Score snippet/page chunk similarity on int8-quantized embeddings (scores drift < 0.01, off by default)
+SIMILARITY_QUALITY_INT8 = os.environ.get("SIMILARITY_QUALITY_INT8", "False").lower() == 'true'
+# Run the snippet/page chunk similarity encoder in FP16 on CUDA (scores move by ~1e-3, off by default)
+SIMILARITY_QUALITY_FP16 = os.environ.get("SIMILARITY_QUALITY_FP16", "False").lower() == 'true'
+
 VERICORE_VALIDATOR_VERSION = os.environ.get("VERICORE_VALIDATOR_VERSION", "v0.0.36")
 
 INITIAL_WEIGHT = 0.7
@@ -1,6 +1,3 @@
-import json
-from dataclasses import asdict
-
 import requests
 
 import bittensor as bt
@@ -35,7 +32,7 @@ class ValidatorResultsDataHandler:
                 "signature": signature,
                 "type": LoggerType.Validator.value,
             }
-            json_data = json.dumps(asdict(results_data))
+            json_data = results_data.to_json()
             bt.logging.info(f"DAEMON | {self.validator_uid} | Sending json response to {self.proxy_url}")
             requests.post(self.proxy_url, json=json_data, timeout=300, headers=headers)
             bt.logging.info(f"DAEMON | {self.validator_uid} | Sent to store response data")
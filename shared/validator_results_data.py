@@ -1,14 +1,45 @@
-from typing import List
-from dataclasses import dataclass, field, asdict
+import json
+import sys
+from typing import ClassVar, List, Optional, Sequence, Tuple
+from dataclasses import dataclass, field, fields
 
+import numpy as np
 
-@dataclass
+# Default for per-UID arrays; integer inputs (e.g. u16 weights) keep an integer dtype instead.
+SCORE_DTYPE = np.float64
+UID_DTYPE = np.int32
+
+
+def _empty_scores() -> np.ndarray:
+    return np.zeros(0, dtype=SCORE_DTYPE)
+
+
+def _as_score_array(values: Sequence[float]) -> np.ndarray:
+    """Pack per-UID values, keeping ints as ints so the JSON matches the list they came from."""
+    array = np.asarray(values)
+    if array.dtype.kind not in "iuf":
+        array = array.astype(SCORE_DTYPE)
+    return array
+
+
+def _empty_uids() -> np.ndarray:
+    return np.empty(0, dtype=UID_DTYPE)
+
+
+@dataclass(slots=True, eq=False, repr=False, match_args=False)
 class ValidatorResultsData:
     """
-    All list fields (calculated_weights, incentives, moving_scores) are indexed by UID:
+    All per-UID arrays (calculated_weights, incentives, moving_scores) are indexed by UID:
     index i = value for UID i. Dashboard must use e.g. calculated_weights[uid], not
     calculated_weights[row_index]. Validators get 0 calculated weight by design.
+
+    The per-UID arrays are NumPy arrays; they are converted to lists only in to_json_dict().
+    validator_uids is a sorted int32 array so has_validator_uid() can binary search it.
+    Records are compared by identity (no generated __eq__); nothing compares their contents.
     """
+    # Populated once below the class; avoids re-walking fields() on every serialization.
+    _FIELD_NAMES: ClassVar[Tuple[str, ...]] = ()
+
     unique_id: str = ""
     block_number: int = -1
     validator_uid: int = -1
@@ -16,8 +47,55 @@ class ValidatorResultsData:
     timestamp: float = 0
     has_summary_data: bool = False
     vericore_responses: List[dict] = field(default_factory=list)
-    calculated_weights: List[float] = field(default_factory=list)  # indexed by UID
-    incentives: List[float] = field(default_factory=list)  # indexed by UID; on-chain (previous epoch / pre-reveal)
-    moving_scores: List[float] = field(default_factory=list)  # indexed by UID
-    validator_uids: List[int] = field(default_factory=list)
+    calculated_weights: np.ndarray = field(default_factory=_empty_scores)  # indexed by UID
+    incentives: np.ndarray = field(default_factory=_empty_scores)  # indexed by UID; on-chain (previous epoch / pre-reveal)
+    moving_scores: np.ndarray = field(default_factory=_empty_scores)  # indexed by UID
+    validator_uids: np.ndarray = field(default_factory=_empty_uids)  # sorted
     burn_uid: int = -1  # Emission control UID; dashboard can show this miner first (has most incentives)
+
+    @classmethod
+    def from_uid_scores(
+        cls,
+        weights: Sequence[float],
+        incentives: Sequence[float],
+        scores: Sequence[float],
+        validator_uids: Optional[Sequence[int]] = None,
+    ) -> "ValidatorResultsData":
+        """Build a record from per-UID sequences, converting each to a packed array once."""
+        return cls(
+            calculated_weights=_as_score_array(weights),
+            incentives=_as_score_array(incentives),
+            moving_scores=_as_score_array(scores),
+            validator_uids=np.sort(np.asarray([] if validator_uids is None else validator_uids, dtype=UID_DTYPE)),
+        )
+
+    def has_validator_uid(self, uid: int) -> bool:
+        """O(log N) membership test on the sorted validator_uids array."""
+        idx = np.searchsorted(self.validator_uids, uid)
+        return bool(idx < self.validator_uids.size and self.validator_uids[idx] == uid)
+
+    def __repr__(self) -> str:
+        # The generated repr would walk vericore_responses and every per-UID array
+        return (
+            f"{type(self).__name__}(unique_id={self.unique_id!r}, "
+            f"block_number={self.block_number}, validator_uid={self.validator_uid})"
+        )
+
+    def to_dict(self) -> dict:
+        """Shallow equivalent of dataclasses.asdict (no recursive deepcopy of the response lists)."""
+        return {name: getattr(self, name) for name in self._FIELD_NAMES}
+
+    def to_json_dict(self) -> dict:
+        """Like to_dict(), with arrays converted to lists so the result is JSON serializable."""
+        data = self.to_dict()
+        for name, value in data.items():
+            if isinstance(value, np.ndarray):
+                data[name] = value.tolist()
+        return data
+
+    def to_json(self) -> str:
+        """JSON payload sent to the store; serialized on every call, so in-place edits are always included."""
+        return json.dumps(self.to_json_dict())
+
+
+ValidatorResultsData._FIELD_NAMES = tuple(sys.intern(f.name) for f in fields(ValidatorResultsData))
@@ -16,6 +16,15 @@ Usage:
     # Local/Development
     python tests/manual/test_blacklist_integration.py --wallet.name mywallet --wallet.hotkey miner_hotkey --netuid 1 --subtensor.network ws://127.0.0.1:9944
 
+    # pytest (one case per hotkey; the metagraph is synced once per session)
+    NETUID=70 pytest tests/manual/test_blacklist_integration.py -v
+
+    # Synced metagraphs are cached on disk for 5 minutes; force a fresh sync with
+    python tests/manual/test_blacklist_integration.py ... --force-sync    (or env FORCE_SYNC=1 for pytest)
+
+    # Per-synapse debug details (printed once at the end)
+    python tests/manual/test_blacklist_integration.py ... --verbose
+
 Note:
     - The wallet does NOT need to be registered on the subnet you're testing
     - The wallet is only used to connect to the network
@@ -36,7 +45,15 @@ This test will:
 
 import sys
 import os
+import io
+import re
+import time
+import pickle
 import argparse
+import functools
+import operator
+import types
+import numpy as np
 import pytest
 import bittensor as bt
 
@@ -44,17 +61,90 @@ import bittensor as bt
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
 
 from miner.perplexica.miner import Miner
+from shared.blacklist import build_blacklist_lookups, is_blacklisted
 from shared.veridex_protocol import VericoreSynapse
 
+# Callers guard axon_info is None explicitly; attrgetter avoids getattr's default/AttributeError path
+_GET_IS_SERVING = operator.attrgetter("is_serving")
+_GET_IP = operator.attrgetter("ip")
+_GET_PORT = operator.attrgetter("port")
 
-def create_real_synapse(hotkey, metagraph=None):
-    """Create a real synapse object with the given hotkey"""
-    # Create a minimal synapse for testing
-    # The synapse needs statement as it's required, but we're only testing blacklist_fn
-    synapse = VericoreSynapse(statement="test statement")
+# Number of hotkeys of each kind checked against blacklist_fn
+MAX_SERVING_VALIDATORS = 5
+MAX_NOT_SERVING_VALIDATORS = 5
+MAX_MINERS = 3
+UNKNOWN_HOTKEY = "5FHneW46xGXgs5mUiveU4sbTyGBzmstUspZC92UhjJM694ty"  # Random hotkey
 
-    # The dendrite represents the requester (validator/miner making the request)
-    # We need to create a proper TerminalInfo object with the CORRECT hotkey
+# Synced metagraphs are pickled here so repeated runs don't re-sync within the TTL.
+# Per-user and mode 0700: unpickling a file another user can write would run their code.
+METAGRAPH_CACHE_DIR = os.path.expanduser("~/.cache/vericore/metagraphs")
+DEFAULT_METAGRAPH_CACHE_TTL = 300  # seconds
+
+
+def index_metagraph(metagraph):
+    """Build per-sync lookup structures and cache them on the metagraph.
+
+    Call again after every metagraph.sync(). Caches:
+    - _hotkey_to_uid: hotkey -> UID dict (O(1) instead of scanning metagraph.hotkeys)
+    - _serving_mask: bool array, True where the neuron has axon_info and is_serving
+    - _helper_cache: results of the @memoize_per_sync helpers (reset here)
+    """
+    metagraph._helper_cache = {}
+    metagraph._hotkey_to_uid = {hotkey: uid for uid, hotkey in enumerate(metagraph.hotkeys)}
+    metagraph._serving_mask = np.fromiter(
+        (
+            neuron.axon_info is not None and _GET_IS_SERVING(neuron.axon_info)
+            for neuron in metagraph.neurons
+        ),
+        dtype=bool,
+        count=len(metagraph.neurons),
+    )
+
+
+def get_hotkey_to_uid(metagraph):
+    """Return the cached hotkey -> UID dict, indexing the metagraph on first use."""
+    if getattr(metagraph, "_hotkey_to_uid", None) is None:
+        index_metagraph(metagraph)
+    return metagraph._hotkey_to_uid
+
+
+def get_serving_mask(metagraph):
+    """Return the cached per-UID is_serving mask, indexing the metagraph on first use."""
+    if getattr(metagraph, "_serving_mask", None) is None:
+        index_metagraph(metagraph)
+    return metagraph._serving_mask
+
+
+def memoize_per_sync(fn):
+    """Cache fn(metagraph, ...) on the metagraph, keyed by block, netuid and the call args.
+
+    The metagraph is not mutated between syncs, so results are pure functions of that key.
+    index_metagraph() resets the cache, so results never outlive a metagraph.sync().
+    """
+    @functools.wraps(fn)
+    def wrapper(metagraph, *args, **kwargs):
+        if getattr(metagraph, "_helper_cache", None) is None:
+            index_metagraph(metagraph)
+        key = (
+            fn.__name__,
+            int(metagraph.block),
+            getattr(metagraph, "netuid", None),
+            args,
+            tuple(sorted(kwargs.items())),
+        )
+        cache = metagraph._helper_cache
+        if key not in cache:
+            cache[key] = fn(metagraph, *args, **kwargs)
+        return list(cache[key])
+    return wrapper
+
+
+def _build_dendrite_factory(metagraph):
+    """Work out once how to build a dendrite TerminalInfo for this metagraph.
+
+    Returns a callable hotkey -> terminal using the first construction path that the synapse
+    accepts, or None when only the SimpleNamespace fallback in create_real_synapse works.
+    """
     # NOTE: We cannot use neuron.axon_info directly because axon_info.hotkey
     # may not match the neuron's hotkey in metagraph.hotkeys[uid]
 
@@ -66,53 +156,76 @@ def create_real_synapse(hotkey, metagraph=None):
                 template_axon = neuron.axon_info
                 break
 
-    if template_axon:
+    if not template_axon:
+        return None
+
+    def from_full_dump():
+        # Use model_dump to get dict, then model_construct (or the plain constructor).
+        # The template came from a validated metagraph neuron and only hotkey changes,
+        # so model_construct skips re-running the field validators.
+        if hasattr(template_axon, 'model_dump'):
+            axon_dict = template_axon.model_dump()
+        else:
+            axon_dict = dict(template_axon.__dict__)
+        if hasattr(template_axon, 'model_construct'):
+            return axon_dict, lambda d: template_axon.__class__.model_construct(**d)
+        return axon_dict, lambda d: type(template_axon)(**d)
+
+    def from_terminal_fields():
+        terminal_dict = {
+            'version': getattr(template_axon, 'version', 0),
+            'ip': getattr(template_axon, 'ip', '0.0.0.0'),
+            'port': getattr(template_axon, 'port', 0),
+            'ip_type': getattr(template_axon, 'ip_type', 4),
+            'coldkey': getattr(template_axon, 'coldkey', ''),
+        }
+        return terminal_dict, lambda d: type(template_axon)(**d)
+
+    # Probe each path once with a real assignment; the synapse validates dendrite on assignment
+    probe = VericoreSynapse(statement="test statement")
+    for build in (from_full_dump, from_terminal_fields):
         try:
-            # Create a new TerminalInfo with the correct hotkey
-            # Use model_dump to get dict, set correct hotkey, then model_validate
-            if hasattr(template_axon, 'model_dump'):
-                axon_dict = template_axon.model_dump()
-            else:
-                axon_dict = dict(template_axon.__dict__)
+            base, construct = build()
+            probe.dendrite = construct({**base, 'hotkey': template_axon.hotkey})
+        except Exception:
+            continue
+        return lambda hotkey: construct({**base, 'hotkey': hotkey})
+    return None
 
-            axon_dict['hotkey'] = hotkey
 
-            # Use model_validate to create new TerminalInfo
-            if hasattr(template_axon, 'model_validate'):
-                terminal = template_axon.__class__.model_validate(axon_dict)
-            else:
-                terminal = type(template_axon)(**axon_dict)
+def get_dendrite_factory(metagraph):
+    """Return the cached dendrite factory for the metagraph (reset by index_metagraph)."""
+    if getattr(metagraph, "_helper_cache", None) is None:
+        index_metagraph(metagraph)
+    cache = metagraph._helper_cache
+    if "dendrite_factory" not in cache:
+        cache["dendrite_factory"] = _build_dendrite_factory(metagraph)
+    return cache["dendrite_factory"]
 
-            synapse.dendrite = terminal
-            return synapse
-        except Exception as e1:
-            # Try using type() constructor
-            try:
-                terminal_dict = {
-                    'version': getattr(template_axon, 'version', 0),
-                    'ip': getattr(template_axon, 'ip', '0.0.0.0'),
-                    'port': getattr(template_axon, 'port', 0),
-                    'ip_type': getattr(template_axon, 'ip_type', 4),
-                    'hotkey': hotkey,
-                    'coldkey': getattr(template_axon, 'coldkey', ''),
-                }
-                terminal = type(template_axon)(**terminal_dict)
-                synapse.dendrite = terminal
-                return synapse
-            except Exception as e2:
-                # Final fallback: bypass Pydantic validation
-                pass
-
-    # Fallback: Create a minimal object with just the hotkey attribute
-    # and bypass Pydantic validation using object.__setattr__
-    class MinimalTerminal:
-        def __init__(self, hotkey):
-            self.hotkey = hotkey
-
-    object.__setattr__(synapse, 'dendrite', MinimalTerminal(hotkey))
+
+def create_real_synapse(hotkey, make_dendrite=None):
+    """Create a real synapse object with the given hotkey.
+
+    make_dendrite is the prebuilt factory from get_dendrite_factory(metagraph); callers fetch it
+    once per sync and reuse it for every synapse.
+    """
+    # Create a minimal synapse for testing
+    # The synapse needs statement as it's required, but we're only testing blacklist_fn
+    synapse = VericoreSynapse(statement="test statement")
+
+    # The dendrite represents the requester (validator/miner making the request)
+    # We need to create a proper TerminalInfo object with the CORRECT hotkey.
+    if make_dendrite is not None:
+        synapse.dendrite = make_dendrite(hotkey)
+        return synapse
+
+    # Fallback: a minimal object with just the hotkey attribute, written straight into the
+    # model's __dict__ to bypass Pydantic's validate-on-assignment
+    synapse.__dict__['dendrite'] = types.SimpleNamespace(hotkey=hotkey)
     return synapse
 
 
+@memoize_per_sync
 def get_validators_from_metagraph(metagraph, max_validators=10, serving_only=False):
     """Get a list of validators from the metagraph.
 
@@ -121,24 +234,29 @@ def get_validators_from_metagraph(metagraph, max_validators=10, serving_only=Fal
         max_validators: Max number to return
         serving_only: If True, only return validators with axon_info and is_serving (valid IP)
     """
+    mask = np.asarray(metagraph.validator_permit, dtype=bool)
+    if serving_only:
+        mask = mask & get_serving_mask(metagraph)
+    return _validator_rows(metagraph, np.flatnonzero(mask)[:max_validators])
+
+
+def _validator_rows(metagraph, uids):
+    """Build the validator dicts for the selected UIDs; only those neurons are dereferenced."""
+    serving = get_serving_mask(metagraph)
     validators = []
-    for i, neuron in enumerate(metagraph.neurons):
-        if neuron.validator_permit:
-            if serving_only:
-                if neuron.axon_info is None or not getattr(neuron.axon_info, "is_serving", False):
-                    continue
-            validators.append({
-                'uid': i,
-                'hotkey': neuron.hotkey,
-                'validator_permit': neuron.validator_permit,
-                'axon_info': neuron.axon_info,
-                'is_serving': getattr(neuron.axon_info, "is_serving", False) if neuron.axon_info else False,
-            })
-            if len(validators) >= max_validators:
-                break
+    for uid in uids:
+        neuron = metagraph.neurons[uid]
+        validators.append({
+            'uid': int(uid),
+            'hotkey': neuron.hotkey,
+            'validator_permit': neuron.validator_permit,
+            'axon_info': neuron.axon_info,
+            'is_serving': bool(serving[uid]),
+        })
     return validators
 
 
+@memoize_per_sync
 def get_validators_with_permit_and_axon(metagraph):
     """Get all validators that the miner would accept (same logic as miner/perplexity/miner.py blacklist_fn).
 
@@ -151,42 +269,124 @@ def get_validators_with_permit_and_axon(metagraph):
     This mirrors the miner's blacklist_fn: accept only when these checks pass (no axon_info or
     not is_serving => reject; e.g. 0.0.0.0 validators have is_serving False).
     """
+    hotkey_to_uid = get_hotkey_to_uid(metagraph)
+    mask = np.asarray(metagraph.validator_permit, dtype=bool) & get_serving_mask(metagraph)
+
     validators = []
-    for i, neuron in enumerate(metagraph.neurons):
-        if neuron.hotkey not in metagraph.hotkeys:
-            continue
-        if not neuron.validator_permit:
-            continue
-        if neuron.axon_info is None:
-            continue
-        if not getattr(neuron.axon_info, "is_serving", False):
+    for uid in np.flatnonzero(mask):
+        neuron = metagraph.neurons[uid]
+        if neuron.hotkey not in hotkey_to_uid:
             continue
+        # axon_info is not None here: the serving mask already requires it
+        axon_info = neuron.axon_info
         validators.append({
-            "uid": i,
+            "uid": int(uid),
             "hotkey": neuron.hotkey,
-            "ip": getattr(neuron.axon_info, "ip", "0.0.0.0"),
-            "port": getattr(neuron.axon_info, "port", 0),
+            "ip": _GET_IP(axon_info),
+            "port": _GET_PORT(axon_info),
         })
     return validators
 
 
+@memoize_per_sync
 def get_miners_from_metagraph(metagraph, max_miners=5):
     """Get a list of miners (non-validators) from the metagraph"""
+    hotkey_to_uid = get_hotkey_to_uid(metagraph)
+    permits = np.asarray(metagraph.validator_permit, dtype=bool)
+
     miners = []
-    for i, neuron in enumerate(metagraph.neurons):
-        if not neuron.validator_permit and neuron.hotkey in metagraph.hotkeys:
-            miners.append({
-                'uid': i,
-                'hotkey': neuron.hotkey,
-                'validator_permit': neuron.validator_permit,
-                'axon_info': neuron.axon_info
-            })
-            if len(miners) >= max_miners:
-                break
+    for uid in np.flatnonzero(~permits):
+        neuron = metagraph.neurons[uid]
+        if neuron.hotkey not in hotkey_to_uid:
+            continue
+        miners.append({
+            'uid': int(uid),
+            'hotkey': neuron.hotkey,
+            'validator_permit': neuron.validator_permit,
+            'axon_info': neuron.axon_info
+        })
+        if len(miners) >= max_miners:
+            break
     return miners
 
 
-def test_fetch_validators_with_permit_and_axon(config):
+@memoize_per_sync
+def get_validators_not_serving(metagraph, max_validators=MAX_NOT_SERVING_VALIDATORS):
+    """Validators with a permit but no axon_info or not is_serving (the miner should reject these)."""
+    mask = np.asarray(metagraph.validator_permit, dtype=bool) & ~get_serving_mask(metagraph)
+    return _validator_rows(metagraph, np.flatnonzero(mask)[:max_validators])
+
+
+def metagraph_cache_path(network, netuid):
+    # Network may be a URL such as ws://127.0.0.1:9944
+    safe_network = re.sub(r"[^\w.-]", "_", str(network))
+    return os.path.join(METAGRAPH_CACHE_DIR, f"mg_{safe_network}_{netuid}.pkl")
+
+
+def is_private_to_user(path):
+    """True if path is owned by the current user and not writable by group or others."""
+    st = os.stat(path)
+    return st.st_uid == os.getuid() and not st.st_mode & 0o022
+
+
+def load_synced_metagraph(subtensor, netuid, ttl=DEFAULT_METAGRAPH_CACHE_TTL, force_sync=False):
+    """Load the metagraph for netuid, sync it and build the lookup caches.
+
+    A synced metagraph younger than ttl seconds is loaded from the on-disk cache instead;
+    force_sync=True always syncs from the chain (and refreshes the cache).
+    """
+    path = metagraph_cache_path(subtensor.network, netuid)
+    os.makedirs(METAGRAPH_CACHE_DIR, mode=0o700, exist_ok=True)
+    metagraph = None
+    if (
+        not force_sync
+        and os.path.exists(path)
+        and time.time() - os.path.getmtime(path) < ttl
+        # Never unpickle a file (or from a directory) someone else could have written
+        and is_private_to_user(METAGRAPH_CACHE_DIR)
+        and is_private_to_user(path)
+    ):
+        try:
+            with open(path, "rb") as f:
+                metagraph = pickle.load(f)
+        except Exception:
+            metagraph = None  # Corrupt or incompatible cache; fall back to a sync
+
+    if metagraph is None:
+        metagraph = subtensor.metagraph(netuid)
+        metagraph.sync()
+        # Pickle before indexing: the helper caches hold closures. Write-then-rename so a
+        # concurrent run never reads a partial file.
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump(metagraph, f)
+            os.replace(tmp_path, path)
+        except Exception:
+            # Caching is best effort; an unpicklable metagraph just isn't cached
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    index_metagraph(metagraph)
+    return metagraph
+
+
+def make_test_miner(metagraph, config):
+    """Create a partially initialized Miner (no wallet/axon) that can run blacklist_fn."""
+    miner = Miner.__new__(Miner)
+    miner.metagraph = metagraph
+    miner.config = config
+    miner.refresh_blacklist_lookups()
+    return miner
+
+
+def _nth_or_skip(items, index, description):
+    if index >= len(items):
+        pytest.skip(f"Only {len(items)} {description} found in metagraph")
+    return items[index]
+
+
+def test_fetch_validators_with_permit_and_axon(config, metagraph):
     """Fetch all validators that have a permit and a valid axon IP; print their UIDs."""
     print("=" * 70)
     print("Fetch validators: permit + valid axon IP (not 0.0.0.0, is_serving)")
@@ -195,10 +395,6 @@ def test_fetch_validators_with_permit_and_axon(config):
     print(f"Netuid: {config.netuid}")
     print()
 
-    subtensor = bt.subtensor(config=config)
-    metagraph = subtensor.metagraph(config.netuid)
-    metagraph.sync()
-
     validators = get_validators_with_permit_and_axon(metagraph)
     uids = [v["uid"] for v in validators]
 
@@ -213,95 +409,152 @@ def test_fetch_validators_with_permit_and_axon(config):
     assert isinstance(uids, list)
 
 
-def test_blacklist_with_real_network(config):
-    """Test blacklist_fn using real Bittensor network"""
-    print("=" * 70)
-    print("Integration Test: Miner Blacklist Function (Real Network)")
-    print("=" * 70)
-    print(f"\nNetwork: {config.subtensor.network}")
-    print(f"Netuid: {config.netuid}")
-    print(f"Wallet: {config.wallet.name}/{config.wallet.hotkey_str}")
-    print()
+@pytest.mark.parametrize("index", range(MAX_SERVING_VALIDATORS))
+def test_validator_serving_allowed(index, metagraph, allowed_hotkeys, blacklist_lookups):
+    """Validators with a serving axon (valid IP) should be ALLOWED."""
+    validators = get_validators_from_metagraph(
+        metagraph, max_validators=MAX_SERVING_VALIDATORS, serving_only=True
+    )
+    validator = _nth_or_skip(validators, index, "validators with axon serving")
+    assert validator["hotkey"] in allowed_hotkeys
+
+    should_blacklist, reason = is_blacklisted(metagraph, validator["hotkey"], blacklist_lookups)
+    assert not should_blacklist, f"Validator UID {validator['uid']} incorrectly blacklisted: {reason}"
+
+
+@pytest.mark.parametrize("index", range(MAX_NOT_SERVING_VALIDATORS))
+def test_validator_not_serving_blocked(index, metagraph, allowed_hotkeys, blacklist_lookups):
+    """Validators with no axon_info or not is_serving should be REJECTED."""
+    validator = _nth_or_skip(get_validators_not_serving(metagraph), index, "validators without valid axon")
+    assert validator["hotkey"] not in allowed_hotkeys
+
+    should_blacklist, _ = is_blacklisted(metagraph, validator["hotkey"], blacklist_lookups)
+    assert should_blacklist, f"Validator UID {validator['uid']} without valid axon incorrectly allowed"
+
+
+@pytest.mark.parametrize("index", range(MAX_MINERS))
+def test_miner_blocked(index, metagraph, allowed_hotkeys, blacklist_lookups):
+    """Miners (no validator_permit) should be REJECTED."""
+    miner_node = _nth_or_skip(get_miners_from_metagraph(metagraph, max_miners=MAX_MINERS), index, "miners")
+    assert miner_node["hotkey"] not in allowed_hotkeys
+
+    should_blacklist, _ = is_blacklisted(metagraph, miner_node["hotkey"], blacklist_lookups)
+    assert should_blacklist, f"Miner UID {miner_node['uid']} incorrectly allowed (SECURITY ISSUE)"
+
+
+def test_unknown_blocked(metagraph, blacklist_lookups):
+    """Hotkeys not in the metagraph should be REJECTED."""
+    should_blacklist, _ = is_blacklisted(metagraph, UNKNOWN_HOTKEY, blacklist_lookups)
+    assert should_blacklist, "Unknown hotkey was NOT blacklisted (SECURITY ISSUE)"
+
+
+def test_blacklist_fn_reads_dendrite_hotkey(miner, make_dendrite):
+    """End to end through Miner.blacklist_fn: the decision is made on the synapse's dendrite hotkey."""
+    should_blacklist, _ = miner.blacklist_fn(create_real_synapse(UNKNOWN_HOTKEY, make_dendrite))
+    assert should_blacklist, "Unknown hotkey was NOT blacklisted (SECURITY ISSUE)"
+
+
+def run_blacklist_with_real_network(config):
+    """Test blacklist_fn using real Bittensor network (script entry point; returns True on success)"""
+    # Output is buffered and written once per test section instead of one write per line
+    buf = io.StringIO()
+    out = functools.partial(print, file=buf)
+
+    def flush_section():
+        sys.stdout.write(buf.getvalue())
+        sys.stdout.flush()
+        buf.seek(0)
+        buf.truncate()
+
+    out("=" * 70)
+    out("Integration Test: Miner Blacklist Function (Real Network)")
+    out("=" * 70)
+    out(f"\nNetwork: {config.subtensor.network}")
+    out(f"Netuid: {config.netuid}")
+    out(f"Wallet: {config.wallet.name}/{config.wallet.hotkey_str}")
+    out()
 
     try:
         # Initialize real Bittensor objects
-        print("Initializing Bittensor objects...")
+        out("Initializing Bittensor objects...")
         wallet = bt.wallet(config=config)
-        print(f"✓ Wallet loaded: {wallet.hotkey.ss58_address}")
+        out(f"✓ Wallet loaded: {wallet.hotkey.ss58_address}")
 
         subtensor = bt.subtensor(config=config)
-        print(f"✓ Subtensor connected: {subtensor.network}")
-
-        metagraph = subtensor.metagraph(config.netuid)
-        print(f"✓ Metagraph loaded: {len(metagraph.neurons)} neurons")
+        out(f"✓ Subtensor connected: {subtensor.network}")
 
         # Sync metagraph to ensure it's up-to-date
-        print("Syncing metagraph to ensure latest state...")
-        metagraph.sync()
-        print(f"✓ Metagraph synced: {len(metagraph.neurons)} neurons")
-        print()
+        out("Loading and syncing metagraph to ensure latest state...")
+        metagraph = load_synced_metagraph(
+            subtensor, config.netuid, ttl=config.metagraph_cache_ttl, force_sync=config.force_sync
+        )
+        hotkey_to_uid = get_hotkey_to_uid(metagraph)
+        make_dendrite = get_dendrite_factory(metagraph)
+        out(f"✓ Metagraph synced: {len(metagraph.neurons)} neurons")
+        out()
 
         # Create miner instance (partial initialization for testing)
-        miner = Miner.__new__(Miner)
-        miner.metagraph = metagraph
-        miner.config = config
+        miner = make_test_miner(metagraph, config)
 
         # Get real validators and miners from the network
-        print("Fetching validators and miners from network...")
+        out("Fetching validators and miners from network...")
         validators_all = get_validators_from_metagraph(metagraph, max_validators=10, serving_only=False)
-        validators_serving = get_validators_from_metagraph(metagraph, max_validators=5, serving_only=True)
-        validators_not_serving = [
-            v for v in validators_all
-            if v["axon_info"] is None or not v.get("is_serving", False)
-        ][:5]
-        miners = get_miners_from_metagraph(metagraph, max_miners=3)
-
-        print(f"✓ Found {len(validators_all)} validators total")
-        print(f"✓ Found {len(validators_serving)} validators with axon serving (valid IP)")
-        print(f"✓ Found {len(validators_not_serving)} validators without valid axon (no axon_info or not is_serving)")
-        print(f"✓ Found {len(miners)} miners")
-        print()
+        validators_serving = get_validators_from_metagraph(
+            metagraph, max_validators=MAX_SERVING_VALIDATORS, serving_only=True
+        )
+        validators_not_serving = get_validators_not_serving(metagraph)
+        miners = get_miners_from_metagraph(metagraph, max_miners=MAX_MINERS)
+
+        out(f"✓ Found {len(validators_all)} validators total")
+        out(f"✓ Found {len(validators_serving)} validators with axon serving (valid IP)")
+        out(f"✓ Found {len(validators_not_serving)} validators without valid axon (no axon_info or not is_serving)")
+        out(f"✓ Found {len(miners)} miners")
+        out()
 
         if len(validators_all) == 0:
-            print("⚠ WARNING: No validators found in metagraph!")
-            print("  Cannot test validator permit check.")
+            out("⚠ WARNING: No validators found in metagraph!")
+            out("  Cannot test validator permit check.")
             return False
 
         if len(miners) == 0:
-            print("⚠ WARNING: No miners found in metagraph!")
-            print("  Cannot test miner rejection.")
+            out("⚠ WARNING: No miners found in metagraph!")
+            out("  Cannot test miner rejection.")
 
         # Test results
         passed = 0
         failed = 0
         results = []
+        # (test, field, value) tuples, printed once at the end with --verbose
+        debug = []
+
+        flush_section()
 
         # Test 1: Test with real validators that have valid axon (is_serving) - should ALLOW
-        print("=" * 70)
-        print("Test 1: Testing with REAL Validators (axon serving, valid IP) - should ALLOW")
-        print("=" * 70)
-        print()
+        out("=" * 70)
+        out("Test 1: Testing with REAL Validators (axon serving, valid IP) - should ALLOW")
+        out("=" * 70)
+        out()
 
         if len(validators_serving) == 0:
-            print("⚠ WARNING: No validators with axon serving found. Skipping Test 1.")
-            print("  (Validators with 0.0.0.0 or no axon_info are blacklisted by miner.)")
+            out("⚠ WARNING: No validators with axon serving found. Skipping Test 1.")
+            out("  (Validators with 0.0.0.0 or no axon_info are blacklisted by miner.)")
         else:
             for i, validator in enumerate(validators_serving, 1):
-                print(f"Test {i}: Validator UID {validator['uid']}")
-                print(f"  Hotkey: {validator['hotkey']}")
-                print(f"  Validator Permit: {validator['validator_permit']}")
+                out(f"Test {i}: Validator UID {validator['uid']}")
+                out(f"  Hotkey: {validator['hotkey']}")
+                out(f"  Validator Permit: {validator['validator_permit']}")
 
-                synapse = create_real_synapse(validator['hotkey'], metagraph)
+                synapse = create_real_synapse(validator['hotkey'], make_dendrite)
 
                 try:
                     # Verify synapse is created correctly
                     if synapse.dendrite.hotkey != validator['hotkey']:
-                        print(f"  ⚠ WARNING: Synapse hotkey mismatch! Expected: {validator['hotkey']}, Got: {synapse.dendrite.hotkey}")
+                        out(f"  ⚠ WARNING: Synapse hotkey mismatch! Expected: {validator['hotkey']}, Got: {synapse.dendrite.hotkey}")
 
                     should_blacklist, reason = miner.blacklist_fn(synapse)
 
                     if not should_blacklist:
-                        print(f"  ✓ PASSED - Validator allowed (as expected)")
+                        out(f"  ✓ PASSED - Validator allowed (as expected)")
                         passed += 1
                         results.append({
                             'type': 'validator',
@@ -310,8 +563,8 @@ def test_blacklist_with_real_network(config):
                             'passed': True
                         })
                     else:
-                        print(f"  ✗ FAILED - Validator was blacklisted (unexpected!)")
-                        print(f"    Reason: {reason}")
+                        out(f"  ✗ FAILED - Validator was blacklisted (unexpected!)")
+                        out(f"    Reason: {reason}")
                         failed += 1
                         results.append({
                             'type': 'validator',
@@ -321,7 +574,7 @@ def test_blacklist_with_real_network(config):
                             'error': 'Validator incorrectly blacklisted'
                         })
                 except Exception as e:
-                    print(f"  ✗ ERROR - Exception: {e}")
+                    out(f"  ✗ ERROR - Exception: {e}")
                     failed += 1
                     results.append({
                         'type': 'validator',
@@ -330,26 +583,28 @@ def test_blacklist_with_real_network(config):
                         'passed': False,
                         'error': str(e)
                     })
-                print()
+                out()
+
+        flush_section()
 
         # Test 1b: Validators with no axon_info or not is_serving (should REJECT)
         if len(validators_not_serving) > 0:
-            print("=" * 70)
-            print("Test 1b: Validators without valid axon (no axon_info or not is_serving) - should REJECT")
-            print("=" * 70)
-            print()
+            out("=" * 70)
+            out("Test 1b: Validators without valid axon (no axon_info or not is_serving) - should REJECT")
+            out("=" * 70)
+            out()
 
             for i, validator in enumerate(validators_not_serving, 1):
-                print(f"Test {i}: Validator UID {validator['uid']} (axon not serving)")
-                print(f"  Hotkey: {validator['hotkey']}")
+                out(f"Test {i}: Validator UID {validator['uid']} (axon not serving)")
+                out(f"  Hotkey: {validator['hotkey']}")
 
-                synapse = create_real_synapse(validator['hotkey'], metagraph)
+                synapse = create_real_synapse(validator['hotkey'], make_dendrite)
 
                 try:
                     should_blacklist, reason = miner.blacklist_fn(synapse)
 
                     if should_blacklist:
-                        print(f"  ✓ PASSED - Validator correctly blacklisted (invalid axon)")
+                        out(f"  ✓ PASSED - Validator correctly blacklisted (invalid axon)")
                         passed += 1
                         results.append({
                             'type': 'validator_not_serving',
@@ -358,7 +613,7 @@ def test_blacklist_with_real_network(config):
                             'passed': True
                         })
                     else:
-                        print(f"  ✗ FAILED - Validator was allowed (should be blacklisted: no axon_info or not is_serving)")
+                        out(f"  ✗ FAILED - Validator was allowed (should be blacklisted: no axon_info or not is_serving)")
                         failed += 1
                         results.append({
                             'type': 'validator_not_serving',
@@ -368,45 +623,57 @@ def test_blacklist_with_real_network(config):
                             'error': 'Validator without valid axon incorrectly allowed'
                         })
                 except Exception as e:
-                    print(f"  ✗ ERROR - Exception: {e}")
+                    out(f"  ✗ ERROR - Exception: {e}")
                     failed += 1
-                print()
+                out()
+
+        flush_section()
 
         # Test 2: Test with real miners (should REJECT)
         if len(miners) > 0:
-            print("=" * 70)
-            print("Test 2: Testing with REAL Miners (should REJECT)")
-            print("=" * 70)
-            print()
+            out("=" * 70)
+            out("Test 2: Testing with REAL Miners (should REJECT)")
+            out("=" * 70)
+            out()
 
             for i, miner_node in enumerate(miners, 1):
-                print(f"Test {i}: Miner UID {miner_node['uid']}")
-                print(f"  Hotkey: {miner_node['hotkey']}")
-                print(f"  Validator Permit: {miner_node['validator_permit']}")
+                out(f"Test {i}: Miner UID {miner_node['uid']}")
+                out(f"  Hotkey: {miner_node['hotkey']}")
+                out(f"  Validator Permit: {miner_node['validator_permit']}")
 
-                synapse = create_real_synapse(miner_node['hotkey'], metagraph)
+                synapse = create_real_synapse(miner_node['hotkey'], make_dendrite)
+                label = f"Miner UID {miner_node['uid']}"
 
                 try:
-                    # Debug: Check what the synapse has
-                    print(f"  DEBUG: Synapse dendrite type: {type(synapse.dendrite)}")
-                    print(f"  DEBUG: Synapse dendrite hotkey: {synapse.dendrite.hotkey}")
-                    print(f"  DEBUG: Expected hotkey: {miner_node['hotkey']}")
-                    print(f"  DEBUG: Hotkeys match: {synapse.dendrite.hotkey == miner_node['hotkey']}")
-                    print(f"  DEBUG: Hotkey in metagraph: {synapse.dendrite.hotkey in miner.metagraph.hotkeys}")
-                    if synapse.dendrite.hotkey in miner.metagraph.hotkeys:
-                        neuron_uid = miner.metagraph.hotkeys.index(synapse.dendrite.hotkey)
-                        neuron = miner.metagraph.neurons[neuron_uid]
-                        print(f"  DEBUG: Found neuron UID: {neuron_uid}")
-                        print(f"  DEBUG: Neuron hotkey: {neuron.hotkey}")
-                        print(f"  DEBUG: Neuron validator_permit: {neuron.validator_permit}")
-                        print(f"  DEBUG: Expected validator_permit: {miner_node['validator_permit']}")
-                        print(f"  DEBUG: Neuron hotkey matches synapse: {neuron.hotkey == synapse.dendrite.hotkey}")
+                    if config.verbose:
+                        # Debug: Check what the synapse has
+                        dendrite_hotkey = synapse.dendrite.hotkey
+                        neuron_uid = hotkey_to_uid.get(dendrite_hotkey)
+                        debug.extend([
+                            (label, "Synapse dendrite type", type(synapse.dendrite)),
+                            (label, "Synapse dendrite hotkey", dendrite_hotkey),
+                            (label, "Expected hotkey", miner_node['hotkey']),
+                            (label, "Hotkeys match", dendrite_hotkey == miner_node['hotkey']),
+                            (label, "Hotkey in metagraph", neuron_uid is not None),
+                        ])
+                        if neuron_uid is not None:
+                            neuron = miner.metagraph.neurons[neuron_uid]
+                            debug.extend([
+                                (label, "Found neuron UID", neuron_uid),
+                                (label, "Neuron hotkey", neuron.hotkey),
+                                (label, "Neuron validator_permit", neuron.validator_permit),
+                                (label, "Expected validator_permit", miner_node['validator_permit']),
+                                (label, "Neuron hotkey matches synapse", neuron.hotkey == dendrite_hotkey),
+                            ])
 
                     should_blacklist, reason = miner.blacklist_fn(synapse)
-                    print(f"  DEBUG: blacklist_fn returned: should_blacklist={should_blacklist}, reason={reason}")
+                    if config.verbose:
+                        debug.append(
+                            (label, "blacklist_fn returned", f"should_blacklist={should_blacklist}, reason={reason}")
+                        )
 
                     if should_blacklist:
-                        print(f"  ✓ PASSED - Miner correctly blacklisted")
+                        out(f"  ✓ PASSED - Miner correctly blacklisted")
                         passed += 1
                         results.append({
                             'type': 'miner',
@@ -415,8 +682,8 @@ def test_blacklist_with_real_network(config):
                             'passed': True
                         })
                     else:
-                        print(f"  ✗ FAILED - Miner was NOT blacklisted (SECURITY ISSUE!)")
-                        print(f"    This miner should be rejected because validator_permit=False")
+                        out(f"  ✗ FAILED - Miner was NOT blacklisted (SECURITY ISSUE!)")
+                        out(f"    This miner should be rejected because validator_permit=False")
                         failed += 1
                         results.append({
                             'type': 'miner',
@@ -426,7 +693,7 @@ def test_blacklist_with_real_network(config):
                             'error': 'Miner incorrectly allowed (SECURITY ISSUE)'
                         })
                 except Exception as e:
-                    print(f"  ✗ ERROR - Exception: {e}")
+                    out(f"  ✗ ERROR - Exception: {e}")
                     failed += 1
                     results.append({
                         'type': 'miner',
@@ -435,62 +702,66 @@ def test_blacklist_with_real_network(config):
                         'passed': False,
                         'error': str(e)
                     })
-                print()
+                out()
+
+        flush_section()
 
         # Test 3: Test with unknown hotkey (should REJECT)
-        print("=" * 70)
-        print("Test 3: Testing with Unknown Hotkey (should REJECT)")
-        print("=" * 70)
-        print()
+        out("=" * 70)
+        out("Test 3: Testing with Unknown Hotkey (should REJECT)")
+        out("=" * 70)
+        out()
 
-        unknown_hotkey = "5FHneW46xGXgs5mUiveU4sbTyGBzmstUspZC92UhjJM694ty"  # Random hotkey
-        print(f"Test: Unknown Hotkey")
-        print(f"  Hotkey: {unknown_hotkey}")
+        unknown_hotkey = UNKNOWN_HOTKEY
+        out(f"Test: Unknown Hotkey")
+        out(f"  Hotkey: {unknown_hotkey}")
 
-        synapse = create_real_synapse(unknown_hotkey, metagraph)
+        synapse = create_real_synapse(unknown_hotkey, make_dendrite)
 
         try:
-            # Debug: Check what the synapse has
-            print(f"  DEBUG: Synapse dendrite hotkey: {synapse.dendrite.hotkey}")
-            print(f"  DEBUG: Expected hotkey: {unknown_hotkey}")
-            print(f"  DEBUG: Hotkeys match: {synapse.dendrite.hotkey == unknown_hotkey}")
-            print(f"  DEBUG: Hotkey in metagraph: {synapse.dendrite.hotkey in miner.metagraph.hotkeys}")
+            if config.verbose:
+                # Debug: Check what the synapse has
+                debug.extend([
+                    ("Unknown hotkey", "Synapse dendrite hotkey", synapse.dendrite.hotkey),
+                    ("Unknown hotkey", "Expected hotkey", unknown_hotkey),
+                    ("Unknown hotkey", "Hotkeys match", synapse.dendrite.hotkey == unknown_hotkey),
+                    ("Unknown hotkey", "Hotkey in metagraph", synapse.dendrite.hotkey in hotkey_to_uid),
+                ])
 
             should_blacklist, reason = miner.blacklist_fn(synapse)
 
             if should_blacklist:
-                print(f"  ✓ PASSED - Unknown hotkey correctly blacklisted")
+                out(f"  ✓ PASSED - Unknown hotkey correctly blacklisted")
                 passed += 1
             else:
-                print(f"  ✗ FAILED - Unknown hotkey was NOT blacklisted (SECURITY ISSUE!)")
+                out(f"  ✗ FAILED - Unknown hotkey was NOT blacklisted (SECURITY ISSUE!)")
                 failed += 1
         except Exception as e:
-            print(f"  ✗ ERROR - Exception: {e}")
+            out(f"  ✗ ERROR - Exception: {e}")
             failed += 1
-        print()
+        out()
+
+        flush_section()
 
         # Test 4: Test with your own wallet (validator with axon serving: allow; miner or validator not serving: reject)
-        print("=" * 70)
-        print("Test 4: Testing with Your Wallet")
-        print("=" * 70)
-        print()
+        out("=" * 70)
+        out("Test 4: Testing with Your Wallet")
+        out("=" * 70)
+        out()
 
         your_hotkey = wallet.hotkey.ss58_address
-        print(f"Your Hotkey: {your_hotkey}")
+        out(f"Your Hotkey: {your_hotkey}")
 
         # Check if your wallet is in the metagraph
-        if your_hotkey in metagraph.hotkeys:
-            your_uid = metagraph.hotkeys.index(your_hotkey)
+        if your_hotkey in hotkey_to_uid:
+            your_uid = hotkey_to_uid[your_hotkey]
             your_neuron = metagraph.neurons[your_uid]
-            your_axon_serving = (
-                your_neuron.axon_info is not None
-                and getattr(your_neuron.axon_info, "is_serving", False)
-            )
-            print(f"Your UID: {your_uid}")
-            print(f"Your Validator Permit: {your_neuron.validator_permit}")
-            print(f"Your Axon Serving: {your_axon_serving}")
+            your_axon_serving = bool(get_serving_mask(metagraph)[your_uid])
+            out(f"Your UID: {your_uid}")
+            out(f"Your Validator Permit: {your_neuron.validator_permit}")
+            out(f"Your Axon Serving: {your_axon_serving}")
 
-            synapse = create_real_synapse(your_hotkey, metagraph)
+            synapse = create_real_synapse(your_hotkey, make_dendrite)
 
             try:
                 should_blacklist, reason = miner.blacklist_fn(synapse)
@@ -498,47 +769,58 @@ def test_blacklist_with_real_network(config):
                 if your_neuron.validator_permit and your_axon_serving:
                     # You're a validator with valid axon, should be allowed
                     if not should_blacklist:
-                        print(f"  ✓ PASSED - Your validator wallet (axon serving) is correctly allowed")
+                        out(f"  ✓ PASSED - Your validator wallet (axon serving) is correctly allowed")
                         passed += 1
                     else:
-                        print(f"  ✗ FAILED - Your validator wallet was incorrectly blacklisted")
+                        out(f"  ✗ FAILED - Your validator wallet was incorrectly blacklisted")
                         failed += 1
                 elif your_neuron.validator_permit and not your_axon_serving:
                     # Validator but no axon / not serving (e.g. 0.0.0.0), should be blacklisted
                     if should_blacklist:
-                        print(f"  ✓ PASSED - Your validator wallet (axon not serving) is correctly blacklisted")
+                        out(f"  ✓ PASSED - Your validator wallet (axon not serving) is correctly blacklisted")
                         passed += 1
                     else:
-                        print(f"  ✗ FAILED - Validator without valid axon was incorrectly allowed")
+                        out(f"  ✗ FAILED - Validator without valid axon was incorrectly allowed")
                         failed += 1
                 else:
                     # You're a miner, should be rejected
                     if should_blacklist:
-                        print(f"  ✓ PASSED - Your miner wallet is correctly blacklisted")
+                        out(f"  ✓ PASSED - Your miner wallet is correctly blacklisted")
                         passed += 1
                     else:
-                        print(f"  ✗ FAILED - Your miner wallet was incorrectly allowed")
+                        out(f"  ✗ FAILED - Your miner wallet was incorrectly allowed")
                         failed += 1
             except Exception as e:
-                print(f"  ✗ ERROR - Exception: {e}")
+                out(f"  ✗ ERROR - Exception: {e}")
                 failed += 1
         else:
-            print(f"  ⚠ INFO - Your wallet is not registered in this subnet")
-            print(f"    Cannot test with your own wallet")
-        print()
+            out(f"  ⚠ INFO - Your wallet is not registered in this subnet")
+            out(f"    Cannot test with your own wallet")
+        out()
+
+        flush_section()
+
+        if debug:
+            out("=" * 70)
+            out("Debug Details")
+            out("=" * 70)
+            for label, field, value in debug:
+                out(f"  DEBUG: {label}: {field}: {value}")
+            out()
+            flush_section()
 
         # Summary
-        print("=" * 70)
-        print("Test Summary")
-        print("=" * 70)
-        print(f"Total tests: {passed + failed}")
-        print(f"Passed: {passed} ✓")
-        print(f"Failed: {failed} ✗")
-        print()
+        out("=" * 70)
+        out("Test Summary")
+        out("=" * 70)
+        out(f"Total tests: {passed + failed}")
+        out(f"Passed: {passed} ✓")
+        out(f"Failed: {failed} ✗")
+        out()
 
         # Security check
-        print("Security Check:")
-        print("-" * 70)
+        out("Security Check:")
+        out("-" * 70)
         validator_tests = [r for r in results if r.get('type') == 'validator']
         validator_not_serving_tests = [r for r in results if r.get('type') == 'validator_not_serving']
         miner_tests = [r for r in results if r.get('type') == 'miner']
@@ -548,38 +830,41 @@ def test_blacklist_with_real_network(config):
         miner_blocked = all(r.get('passed', False) for r in miner_tests)
 
         if validator_passed:
-            print("✓ Validators (axon serving) are correctly allowed")
+            out("✓ Validators (axon serving) are correctly allowed")
         else:
-            print("✗ Some validators were incorrectly rejected!")
+            out("✗ Some validators were incorrectly rejected!")
 
         if validator_not_serving_tests and validator_not_serving_blocked:
-            print("✓ Validators without valid axon are correctly blocked")
+            out("✓ Validators without valid axon are correctly blocked")
         elif validator_not_serving_tests and not validator_not_serving_blocked:
-            print("✗ Some validators without valid axon were incorrectly allowed!")
+            out("✗ Some validators without valid axon were incorrectly allowed!")
 
         if miner_blocked:
-            print("✓ Miners are correctly blocked")
+            out("✓ Miners are correctly blocked")
         else:
-            print("✗ Some miners were incorrectly allowed! (CRITICAL SECURITY ISSUE)")
+            out("✗ Some miners were incorrectly allowed! (CRITICAL SECURITY ISSUE)")
 
-        print()
+        out()
 
         if failed == 0:
-            print("=" * 70)
-            print("✓ ALL TESTS PASSED - Blacklist function is working correctly!")
-            print("=" * 70)
+            out("=" * 70)
+            out("✓ ALL TESTS PASSED - Blacklist function is working correctly!")
+            out("=" * 70)
             return True
         else:
-            print("=" * 70)
-            print(f"✗ {failed} TEST(S) FAILED")
-            print("=" * 70)
+            out("=" * 70)
+            out(f"✗ {failed} TEST(S) FAILED")
+            out("=" * 70)
             return False
 
     except Exception as e:
-        print(f"\n✗ ERROR: Test execution failed: {e}")
+        out(f"\n✗ ERROR: Test execution failed: {e}")
+        flush_section()
         import traceback
         traceback.print_exc()
         return False
+    finally:
+        flush_section()
 
 
 def get_config():
@@ -595,6 +880,25 @@ def get_config():
         default=int(os.environ.get("NETUID", "1")),
         help="Subnet UID (default: 1, or env NETUID)",
     )
+    parser.add_argument(
+        "--metagraph_cache_ttl",
+        type=int,
+        default=int(os.environ.get("METAGRAPH_CACHE_TTL", str(DEFAULT_METAGRAPH_CACHE_TTL))),
+        help="Seconds a cached synced metagraph stays valid (default: 300, or env METAGRAPH_CACHE_TTL)",
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        default=os.environ.get("VERBOSE", "").lower() in ("1", "true", "yes"),
+        help="Print per-synapse debug details at the end of the run (or env VERBOSE=1)",
+    )
+    parser.add_argument(
+        "--force-sync",
+        dest="force_sync",
+        action="store_true",
+        default=os.environ.get("FORCE_SYNC", "").lower() in ("1", "true", "yes"),
+        help="Ignore the metagraph cache and sync from the chain (or env FORCE_SYNC=1)",
+    )
     bt.subtensor.add_args(parser)
     bt.wallet.add_args(parser)
     bt.logging.add_args(parser)
@@ -603,12 +907,48 @@ def get_config():
     return config
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def config():
     """Pytest fixture providing Bittensor config (uses get_config() / CLI defaults)."""
     return get_config()
 
 
+@pytest.fixture(scope="session")
+def subtensor(config):
+    return bt.subtensor(config=config)
+
+
+@pytest.fixture(scope="session")
+def metagraph(subtensor, config):
+    """Metagraph synced once per session and shared by every test."""
+    return load_synced_metagraph(
+        subtensor, config.netuid, ttl=config.metagraph_cache_ttl, force_sync=config.force_sync
+    )
+
+
+@pytest.fixture(scope="session")
+def miner(metagraph, config):
+    return make_test_miner(metagraph, config)
+
+
+@pytest.fixture(scope="session")
+def blacklist_lookups(metagraph):
+    """The miner's (hotkey_to_uid, allowed_hotkeys) lookups, built once per session."""
+    return build_blacklist_lookups(metagraph)
+
+
+@pytest.fixture(scope="session")
+def make_dendrite(metagraph):
+    """Dendrite factory for the session metagraph, built once and shared by every synapse."""
+    return get_dendrite_factory(metagraph)
+
+
+@pytest.fixture(scope="session")
+def allowed_hotkeys(metagraph):
+    """Hotkeys the miner should accept, computed independently of blacklist_fn."""
+    return frozenset(v["hotkey"] for v in get_validators_with_permit_and_axon(metagraph))
+
+
 if __name__ == '__main__':
     print("\n" + "=" * 70)
     print("Miner Blacklist Function - Integration Test (Real Network)")
@@ -618,7 +958,7 @@ if __name__ == '__main__':
 
     try:
         config = get_config()
-        success = test_blacklist_with_real_network(config)
+        success = run_blacklist_with_real_network(config)
         sys.exit(0 if success else 1)
     except KeyboardInterrupt:
         print("\n\nTest interrupted by user")
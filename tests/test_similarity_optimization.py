@@ -1,11 +1,24 @@
 """
 Test to verify that the optimized batch encoding produces the same results as the original method.
 """
+import os
+import sys
 import time
 import threading
 from sentence_transformers import SentenceTransformer, util
 
-SENTENCE_SIMILARITY_THRESHOLD = 0.95
+# Run from anywhere: the optimized model is the one the validator ships
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from validator import similarity_quality_model
+from validator.similarity_quality_model import SimilarityQualityModel, SENTENCE_SIMILARITY_THRESHOLD
+
+# FP32 scoring must match the original model to float rounding
+SCORE_TOLERANCE = 1e-6
+# int8 embeddings keep ~2 decimals of cosine precision, enough for the 0.95 threshold
+INT8_SCORE_TOLERANCE = 1e-2
+# SIMILARITY_QUALITY_FP16 on CUDA moves scores by ~1e-3
+FP16_SCORE_TOLERANCE = 1e-3
 
 
 class OldSimilarityModel:
@@ -33,38 +46,6 @@ class OldSimilarityModel:
         return best_score > similarity_threshold, best_score
 
 
-class NewSimilarityModel:
-    """Optimized implementation with batched encoding."""
-    
-    def __init__(self):
-        self.model = SentenceTransformer("all-MiniLM-L6-v2")
-        self.lock = threading.Semaphore(3)
-
-    def chunk_text(self, text, window_size=3, step=1):
-        sentences = text.split(". ")
-        chunks = [" ".join(sentences[i: i + window_size]) for i in range(0, len(sentences), step)]
-        return chunks
-
-    def verify_similarity(self, snippet_text: str, context_text: str, similarity_threshold=SENTENCE_SIMILARITY_THRESHOLD):
-        chunks = self.chunk_text(context_text, window_size=3)
-        
-        # Optimized: Single batched encode call
-        all_texts = [snippet_text] + chunks
-        
-        with self.lock:
-            all_embeddings = self.model.encode(all_texts, convert_to_tensor=True, batch_size=32)
-        
-        snippet_embedding = all_embeddings[0:1]
-        chunk_embeddings = all_embeddings[1:]
-        
-        if len(chunk_embeddings) == 0:
-            return False, 0.0
-        
-        similarities = util.pytorch_cos_sim(snippet_embedding, chunk_embeddings)
-        best_score = similarities.max().item()
-        return best_score > similarity_threshold, best_score
-
-
 # Test cases
 TEST_CASES = [
     {
@@ -98,7 +79,9 @@ TEST_CASES = [
 def run_tests():
     print("Loading models...")
     old_model = OldSimilarityModel()
-    new_model = NewSimilarityModel()
+    new_model = SimilarityQualityModel(quantize_int8=False)
+    int8_model = SimilarityQualityModel(quantize_int8=True)
+    score_tolerance = FP16_SCORE_TOLERANCE if new_model.half_precision else SCORE_TOLERANCE
     print("Models loaded.\n")
     
     print("=" * 80)
@@ -125,20 +108,39 @@ def run_tests():
         new_time = time.perf_counter() - start
         new_total_time += new_time
         
-        # Compare results
+        # Run new method with int8 embeddings
+        start = time.perf_counter()
+        int8_result, int8_score = int8_model.verify_similarity(test["snippet"], test["context"])
+        int8_time = time.perf_counter() - start
+        
+        # Compare results; int8 against its own tolerance so it never loosens the FP32 check
         score_diff = abs(old_score - new_score)
-        results_match = old_result == new_result and score_diff < 1e-6
+        int8_diff = abs(old_score - int8_score)
+        results_match = (
+            old_result == new_result and score_diff < score_tolerance
+            and int8_diff < INT8_SCORE_TOLERANCE
+        )
         
         status = "✅ PASS" if results_match else "❌ FAIL"
         
         print(f"  Old: result={old_result}, score={old_score:.6f}, time={old_time*1000:.2f}ms")
         print(f"  New: result={new_result}, score={new_score:.6f}, time={new_time*1000:.2f}ms")
-        print(f"  Score diff: {score_diff:.10f}")
+        print(f"  Int8: result={int8_result}, score={int8_score:.6f}, time={int8_time*1000:.2f}ms")
+        print(f"  Score diff: {score_diff:.10f} (int8: {int8_diff:.6f})")
         print(f"  Status: {status}")
         
         if not results_match:
             all_passed = False
     
+    # Every context is cached now; pair each snippet with another test's context so only the snippet is encoded
+    cached_pairs = [(t["snippet"], TEST_CASES[(i + 1) % len(TEST_CASES)]["context"]) for i, t in enumerate(TEST_CASES)]
+    cached_match = all(
+        abs(old_model.verify_similarity(snippet, context)[1] - new_model.verify_similarity(snippet, context)[1]) < score_tolerance
+        for snippet, context in cached_pairs
+    )
+    print(f"\nCached-context scores match: {'✅ YES' if cached_match else '❌ NO'}")
+    all_passed = all_passed and cached_match
+    
     print("\n" + "=" * 80)
     print("SUMMARY")
     print("=" * 80)
@@ -158,7 +160,8 @@ def run_concurrent_test():
     print("CONCURRENT EXECUTION TEST")
     print("=" * 80)
     
-    new_model = NewSimilarityModel()
+    new_model = SimilarityQualityModel(quantize_int8=False)
+    score_tolerance = FP16_SCORE_TOLERANCE if new_model.half_precision else SCORE_TOLERANCE
     
     def run_similarity(test_case):
         return new_model.verify_similarity(test_case["snippet"], test_case["context"])
@@ -170,19 +173,71 @@ def run_concurrent_test():
         results = [f.result() for f in concurrent.futures.as_completed(futures)]
     concurrent_time = time.perf_counter() - start
     
-    # Run sequentially for comparison
+    # Run sequentially for comparison, from a cold cache so both runs do the same work
+    new_model.clear_caches()
     start = time.perf_counter()
     for tc in TEST_CASES * 3:
         run_similarity(tc)
     sequential_time = time.perf_counter() - start
     
+    # Run all test cases through the batched API: one encode call and one vectorized max
+    new_model.clear_caches()
+    workload = TEST_CASES * 3
+    start = time.perf_counter()
+    batch_results = new_model.verify_similarity_batch(
+        [tc["snippet"] for tc in workload], [tc["context"] for tc in workload]
+    )
+    batch_time = time.perf_counter() - start
+    batch_match = all(
+        result == expected[0] and abs(score - expected[1]) < score_tolerance
+        for (result, score), expected in zip(batch_results, (run_similarity(tc) for tc in workload))
+    )
+    
     print(f"15 calls sequential: {sequential_time*1000:.2f}ms")
     print(f"15 calls concurrent: {concurrent_time*1000:.2f}ms")
+    print(f"15 calls batched: {batch_time*1000:.2f}ms")
     print(f"Concurrency benefit: {sequential_time/concurrent_time:.2f}x faster")
+    print(f"Batching benefit: {sequential_time/batch_time:.2f}x faster")
+    print(f"Batched results match: {'✅ YES' if batch_match else '❌ NO'}")
+
+
+def run_batch_consistency_test():
+    """verify_similarity_batch must give exactly the per-pair verify_similarity results, for every scoring toggle."""
+    print("\n" + "=" * 80)
+    print("BATCH vs PER-PAIR CONSISTENCY TEST")
+    print("=" * 80)
+    
+    # Every test pair, every snippet against the other contexts, and a snippet that is a chunk up to whitespace
+    snippets = [tc["snippet"] for tc in TEST_CASES] * len(TEST_CASES)
+    contexts = [tc["context"] for tc in TEST_CASES for _ in TEST_CASES]
+    snippets.append("  Narwhals are fascinating marine mammals. They are known for their long, spiral tusks. These tusks can grow up to 10 feet in length\n")
+    contexts.append(TEST_CASES[1]["context"])
+    
+    all_passed = True
+    for fp16 in (False, True):
+        for quantize_int8 in (False, True):
+            # SIMILARITY_QUALITY_FP16 is read when the model is built (and only takes effect on CUDA)
+            saved_fp16 = similarity_quality_model.SIMILARITY_QUALITY_FP16
+            similarity_quality_model.SIMILARITY_QUALITY_FP16 = fp16
+            try:
+                model = SimilarityQualityModel(quantize_int8=quantize_int8)
+            finally:
+                similarity_quality_model.SIMILARITY_QUALITY_FP16 = saved_fp16
+            
+            batch_results = model.verify_similarity_batch(snippets, contexts)
+            pair_results = [model.verify_similarity(snippet, context) for snippet, context in zip(snippets, contexts)]
+            results_match = batch_results == pair_results
+            print(f"FP16={fp16} (active={model.half_precision}), int8={quantize_int8}: "
+                  f"{'✅ MATCH' if results_match else '❌ MISMATCH'} "
+                  f"({sum(score == 1.0 for _, score in batch_results)} exact-chunk pairs of {len(batch_results)})")
+            all_passed = all_passed and results_match
+    
+    return all_passed
 
 
 if __name__ == "__main__":
     passed = run_tests()
     run_concurrent_test()
+    passed = run_batch_consistency_test() and passed
     
     exit(0 if passed else 1)
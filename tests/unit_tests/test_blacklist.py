@@ -0,0 +1,95 @@
+import unittest
+import sys
+import os
+from types import SimpleNamespace
+
+# Add the parent directory to the path to import the shared module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# Create a mock bittensor module before importing shared.blacklist
+class MockBt:
+    class logging:
+        @staticmethod
+        def trace(msg):
+            pass
+
+        @staticmethod
+        def warning(msg):
+            print(f"WARNING: {msg}")
+
+        @staticmethod
+        def error(msg):
+            print(f"ERROR: {msg}")
+
+# Patch the bittensor module before importing
+sys.modules['bittensor'] = MockBt()
+
+from shared.blacklist import build_blacklist_lookups, is_blacklisted
+
+
+def _neuron(hotkey, validator_permit=False, serving=False, has_axon=True):
+    axon_info = SimpleNamespace(is_serving=serving) if has_axon else None
+    return SimpleNamespace(hotkey=hotkey, validator_permit=validator_permit, axon_info=axon_info)
+
+
+def _metagraph(*neurons):
+    return SimpleNamespace(hotkeys=[n.hotkey for n in neurons], neurons=list(neurons))
+
+
+class TestIsBlacklisted(unittest.TestCase):
+    """Test suite for is_blacklisted"""
+
+    def setUp(self):
+        self.metagraph = _metagraph(
+            _neuron("validator", validator_permit=True, serving=True),
+            _neuron("miner"),
+            _neuron("not_serving", validator_permit=True, serving=False),
+            _neuron("no_axon", validator_permit=True, has_axon=False),
+        )
+        self.lookups = build_blacklist_lookups(self.metagraph)
+
+    def test_serving_validator_allowed(self):
+        """A validator with a permit and a serving axon is accepted"""
+        self.assertEqual(is_blacklisted(self.metagraph, "validator", self.lookups), (False, None))
+
+    def test_rejected_hotkeys(self):
+        """Miners, non-serving validators, validators without axon_info and unknown hotkeys are rejected"""
+        for hotkey in ("miner", "not_serving", "no_axon", "unknown"):
+            self.assertEqual(is_blacklisted(self.metagraph, hotkey, self.lookups), (True, None), hotkey)
+
+    def test_lookups_built_when_not_given(self):
+        """Without lookups the result is the same as with freshly built ones"""
+        for hotkey in ("validator", "miner", "not_serving", "no_axon", "unknown"):
+            self.assertEqual(
+                is_blacklisted(self.metagraph, hotkey),
+                is_blacklisted(self.metagraph, hotkey, self.lookups),
+            )
+
+    def test_stale_lookups_uid_reassigned(self):
+        """A deregistered miner whose old UID now holds a serving validator is still rejected"""
+        # Live metagraph already synced: UID 1 moved from "miner" to a new serving validator
+        live_metagraph = _metagraph(
+            _neuron("validator", validator_permit=True, serving=True),
+            _neuron("new_validator", validator_permit=True, serving=True),
+        )
+        self.assertEqual(is_blacklisted(live_metagraph, "miner", self.lookups), (True, None))
+
+    def test_stale_lookups_new_validator(self):
+        """A hotkey that became a serving validator after the lookups were built waits for the next refresh"""
+        live_metagraph = _metagraph(
+            _neuron("validator", validator_permit=True, serving=True),
+            _neuron("miner", validator_permit=True, serving=True),
+        )
+        self.assertEqual(is_blacklisted(live_metagraph, "miner", self.lookups), (True, None))
+        self.assertEqual(
+            is_blacklisted(live_metagraph, "miner", build_blacklist_lookups(live_metagraph)), (False, None)
+        )
+
+    def test_stale_lookups_uid_out_of_range(self):
+        """A UID missing from the live metagraph is rejected"""
+        live_metagraph = _metagraph(_neuron("validator", validator_permit=True, serving=True))
+        self.assertEqual(is_blacklisted(live_metagraph, "no_axon", self.lookups), (True, None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,6 +3,8 @@ import sys
 import os
 from unittest.mock import patch
 
+import numpy as np
+
 # Add the parent directory to the path to import the validator module
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
 
@@ -78,20 +80,15 @@ def _burn_weights_old(weights, metagraph, burn_perc=EMISSION_CONTROL_PERC):
     target_uid = find_target_uid(metagraph, EMISSION_CONTROL_HOTKEY)
     if target_uid is None or target_uid >= len(weights):
         return list(weights)
-    weights = list(weights)
-    total = sum(weights)
+    w = np.asarray(weights, dtype=np.float64)
+    total = w.sum()
     new_target = burn_perc * total
     remaining = (1 - burn_perc) * total
-    total_other = total - weights[target_uid]
+    total_other = total - w[target_uid]
     if total_other == 0:
-        return weights
-    result = [0.0] * len(weights)
-    for i in range(len(weights)):
-        if i == target_uid:
-            result[i] = new_target
-        else:
-            result[i] = (weights[i] / total_other) * remaining
-    return result
+        return w.tolist()
+    mask_burn = np.arange(len(w)) == target_uid
+    return np.where(mask_burn, new_target, (w / total_other) * remaining).tolist()
 
 
 class TestDistributeWeightsBurnBaseRemainder(unittest.TestCase):
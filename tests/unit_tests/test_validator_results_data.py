@@ -0,0 +1,143 @@
+import json
+import unittest
+import sys
+import os
+
+# Add the parent directory to the path to import the shared module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from shared.validator_results_data import ValidatorResultsData
+
+
+def _baseline_json(weights, incentives, moving_scores, validator_uids):
+    """JSON as produced before the per-UID lists became arrays: json.dumps(asdict(record)) on plain lists."""
+    return json.dumps({
+        "unique_id": "abc",
+        "block_number": 42,
+        "validator_uid": 3,
+        "validator_hotkey": "5Hotkey",
+        "timestamp": 1700000000.5,
+        "has_summary_data": True,
+        "vericore_responses": [{"miner_uid": 1, "score": 0.5}],
+        "calculated_weights": weights,
+        "incentives": incentives,
+        "moving_scores": moving_scores,
+        "validator_uids": validator_uids,
+        "burn_uid": 0,
+    })
+
+
+def _build_record(weights, incentives, moving_scores, validator_uids):
+    record = ValidatorResultsData.from_uid_scores(
+        weights=weights,
+        incentives=incentives,
+        scores=moving_scores,
+        validator_uids=validator_uids,
+    )
+    record.unique_id = "abc"
+    record.block_number = 42
+    record.validator_uid = 3
+    record.validator_hotkey = "5Hotkey"
+    record.timestamp = 1700000000.5
+    record.has_summary_data = True
+    record.vericore_responses = [{"miner_uid": 1, "score": 0.5}]
+    record.burn_uid = 0
+    return record
+
+
+class TestValidatorResultsDataJson(unittest.TestCase):
+    """to_json() must serialize exactly like the original list-based dataclass"""
+
+    def test_integer_weights_match_baseline(self):
+        """Integer weights stay integers ([65535, 0], not [65535.0, 0.0])"""
+        args = ([65535, 0], [0.75, 0.25], [0.9, 0.0], [3])
+        record = _build_record(*args)
+        self.assertEqual(record.to_json(), _baseline_json(*args))
+        self.assertEqual(json.loads(record.to_json())["calculated_weights"], [65535, 0])
+
+    def test_float_weights_match_baseline(self):
+        """Float weights (exponential decay distribution) stay floats"""
+        args = ([32767.5, 32767.5], [0.5, 0.5], [0.1, 0.2], [0, 3])
+        record = _build_record(*args)
+        self.assertEqual(record.to_json(), _baseline_json(*args))
+
+    def test_empty_lists_match_baseline(self):
+        """Records sent without summary data have empty per-UID lists"""
+        args = ([], [], [], [])
+        record = _build_record(*args)
+        self.assertEqual(record.to_json(), _baseline_json(*args))
+
+    def test_to_json_reflects_in_place_changes(self):
+        """Appending to a field after a first to_json() call shows up in the next one"""
+        record = _build_record([65535, 0], [0.5, 0.5], [0.1, 0.2], [3])
+        record.to_json()
+        record.vericore_responses.append({"miner_uid": 2, "score": 0.25})
+        record.calculated_weights[1] = 7
+        data = json.loads(record.to_json())
+        self.assertEqual(len(data["vericore_responses"]), 2)
+        self.assertEqual(data["calculated_weights"], [65535, 7])
+
+    def test_to_json_reflects_reassigned_fields(self):
+        """Reassigning a field after a first to_json() call shows up in the next one"""
+        record = _build_record([65535, 0], [0.5, 0.5], [0.1, 0.2], [3])
+        record.to_json()
+        record.block_number = 43
+        self.assertEqual(json.loads(record.to_json())["block_number"], 43)
+
+
+class TestFromUidScores(unittest.TestCase):
+    """Test suite for ValidatorResultsData.from_uid_scores"""
+
+    def test_arrays_indexed_by_uid(self):
+        """Each per-UID sequence becomes an array with the same values in UID order"""
+        record = ValidatorResultsData.from_uid_scores(
+            weights=[10, 20, 30], incentives=[0.1, 0.2, 0.3], scores=[1.0, 2.0, 3.0]
+        )
+        self.assertEqual(record.calculated_weights.tolist(), [10, 20, 30])
+        self.assertEqual(record.incentives.tolist(), [0.1, 0.2, 0.3])
+        self.assertEqual(record.moving_scores.tolist(), [1.0, 2.0, 3.0])
+
+    def test_validator_uids_sorted(self):
+        """validator_uids are stored sorted, whatever order they are given in"""
+        record = ValidatorResultsData.from_uid_scores([], [], [], validator_uids=[9, 2, 5])
+        self.assertEqual(record.validator_uids.tolist(), [2, 5, 9])
+
+    def test_validator_uids_default_empty(self):
+        """No validator_uids gives an empty array, serialized as []"""
+        record = ValidatorResultsData.from_uid_scores([], [], [])
+        self.assertEqual(record.validator_uids.size, 0)
+        self.assertEqual(json.loads(record.to_json())["validator_uids"], [])
+
+    def test_other_fields_default(self):
+        """Fields not built from UID scores keep their defaults"""
+        record = ValidatorResultsData.from_uid_scores([1], [0.0], [0.0])
+        self.assertEqual(record.unique_id, "")
+        self.assertEqual(record.block_number, -1)
+        self.assertEqual(record.burn_uid, -1)
+        self.assertEqual(record.vericore_responses, [])
+
+
+class TestHasValidatorUid(unittest.TestCase):
+    """Test suite for ValidatorResultsData.has_validator_uid"""
+
+    def setUp(self):
+        self.record = ValidatorResultsData.from_uid_scores([], [], [], validator_uids=[7, 0, 3, 255])
+
+    def test_present_uids(self):
+        """Every listed UID is found, including the first and last"""
+        for uid in (0, 3, 7, 255):
+            self.assertTrue(self.record.has_validator_uid(uid))
+
+    def test_absent_uids(self):
+        """UIDs below, between and above the listed ones are not found"""
+        for uid in (-1, 1, 4, 100, 256):
+            self.assertFalse(self.record.has_validator_uid(uid))
+
+    def test_empty(self):
+        """No validators means no UID is a validator"""
+        record = ValidatorResultsData()
+        self.assertFalse(record.has_validator_uid(0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import hashlib
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+import numpy as np
+import torch
+import bittensor as bt
+from sentence_transformers import SentenceTransformer
+
+try:
+    import simsimd
+    SIMSIMD_AVAILABLE = True
+except ImportError:
+    simsimd = None
+    SIMSIMD_AVAILABLE = False
+    bt.logging.warning("simsimd not available - falling back to NumPy similarity")
+
+MAX_PENDING_TEXTS = 1024  # Bound on texts waiting to be encoded
+
+
+def text_digest(text: str) -> bytes:
+    """BLAKE2b digest of a text, used as its cache key."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def dot_similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Cosine similarity of two unit-length embeddings."""
+    if SIMSIMD_AVAILABLE:
+        return float(simsimd.dot(a, b))
+    return float(np.dot(a, b))
+
+
+class BatchedEncoder:
+    """Cached, batched encoding of texts to unit-length float32 embeddings.
+
+    A single worker thread is the only caller of the model; texts from concurrent callers are
+    coalesced into one model.encode() call. Embeddings are kept in an LRU keyed by text_digest().
+    """
+
+    def __init__(self, model: SentenceTransformer, batch_size: int, cache_size: int):
+        self.model = model
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+        self.embedding_cache = OrderedDict()
+        self.cache_lock = threading.Lock()
+        # Texts waiting to be encoded, as (text, Future) pairs
+        self._pending = queue.Queue(maxsize=MAX_PENDING_TEXTS)
+        threading.Thread(target=self._batch_worker, daemon=True).start()
+
+    def encode(self, texts):
+        """Encode texts to a contiguous float32 array, only running the model for texts not already cached."""
+        keys = [text_digest(text) for text in texts]
+        embeddings = [None] * len(texts)
+        with self.cache_lock:
+            for i, key in enumerate(keys):
+                embedding = self.embedding_cache.get(key)
+                if embedding is not None:
+                    self.embedding_cache.move_to_end(key)
+                    embeddings[i] = embedding
+
+        misses = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if misses:
+            futures = []
+            for i in misses:
+                future = Future()
+                self._pending.put((texts[i], future))
+                futures.append(future)
+            encoded = [future.result() for future in futures]
+            with self.cache_lock:
+                for i, embedding in zip(misses, encoded):
+                    embeddings[i] = embedding
+                    # Rows are views into the worker's batch matrix; a cached view would pin the whole batch
+                    self.embedding_cache[keys[i]] = embedding.copy()
+                while len(self.embedding_cache) > self.cache_size:
+                    self.embedding_cache.popitem(last=False)
+
+        return np.ascontiguousarray(embeddings, dtype=np.float32)
+
+    def clear_cache(self):
+        with self.cache_lock:
+            self.embedding_cache.clear()
+
+    def _batch_worker(self):
+        """Drain whatever texts are already pending into one encode() call.
+
+        Never waits for more texts: a lone caller is encoded straight away, and texts queued by
+        concurrent callers while a batch is running are picked up together by the next one.
+        """
+        while True:
+            batch = [self._pending.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._pending.get_nowait())
+                except queue.Empty:
+                    break
+
+            texts = [text for text, _ in batch]
+            try:
+                # Unit-length embeddings, so cosine similarity is a plain dot product.
+                # inference_mode is explicit since older sentence-transformers releases only use no_grad
+                with torch.inference_mode():
+                    embeddings = self.model.encode(
+                        texts, convert_to_numpy=True, batch_size=len(texts), normalize_embeddings=True
+                    )
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            # One C-contiguous (N, dim) float32 matrix per batch (FP16 models included)
+            embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+            for (_, future), embedding in zip(batch, embeddings):
+                future.set_result(embedding)
@@ -1,35 +1,142 @@
 import argparse
-import threading
-from sentence_transformers import SentenceTransformer, util
+import os
+import shutil
+import tempfile
+import torch
+import bittensor as bt
+from sentence_transformers import SentenceTransformer
 
-MAX_CONCURRENT_CONTEXT_OPS = 5  # Max concurrent context similarity operations
+from shared.environment_variables import (
+    CONTEXT_SIMILARITY_BACKEND,
+    CONTEXT_SIMILARITY_COMPILE,
+    CONTEXT_SIMILARITY_FP16,
+    CONTEXT_SIMILARITY_MODEL,
+    CONTEXT_SIMILARITY_ONNX_DIR,
+)
+
+from validator.batched_encoder import BatchedEncoder, dot_similarity
+
+ONNX_INT8_FILE_NAME = "onnx/model_qint8_avx512_vnni.onnx"
+WARMUP_TEXTS = ["warmup", "a longer warmup sentence so the batch and sequence sizes both vary"]
+ENCODE_BATCH_SIZE = 32  # Max texts coalesced into a single encode() call
+EMBEDDING_CACHE_SIZE = 8192  # Max cached text embeddings
+
+
+def is_private_to_user(path: str) -> bool:
+    """True if path is owned by the current user and not writable by group or others."""
+    st = os.stat(path)
+    return st.st_uid == os.getuid() and not st.st_mode & 0o022
+
+
+def load_onnx_int8_model() -> SentenceTransformer:
+    """Load the encoder on ONNX Runtime with int8 dynamic quantization, exporting it on first use."""
+    # Only in sentence-transformers>=3.2; an ImportError here falls back to the PyTorch encoder
+    from sentence_transformers import export_dynamic_quantized_onnx_model
+
+    os.makedirs(CONTEXT_SIMILARITY_ONNX_DIR, mode=0o700, exist_ok=True)
+    # Never load a graph (or from a directory) someone else could have written
+    if not is_private_to_user(CONTEXT_SIMILARITY_ONNX_DIR):
+        raise PermissionError(f"{CONTEXT_SIMILARITY_ONNX_DIR} must be owned by the current user and not group/world writable")
+    onnx_dir = os.path.join(CONTEXT_SIMILARITY_ONNX_DIR, CONTEXT_SIMILARITY_MODEL.split("/")[-1])
+    onnx_file = os.path.join(onnx_dir, ONNX_INT8_FILE_NAME)
+    if not os.path.exists(onnx_file):
+        bt.logging.info(f"VALIDATOR | Exporting int8 ONNX encoder to {onnx_dir}")
+        # Export into a private temp dir and rename it into place, so a concurrent or
+        # interrupted export never leaves a partial model behind
+        export_dir = tempfile.mkdtemp(dir=CONTEXT_SIMILARITY_ONNX_DIR)
+        try:
+            model = SentenceTransformer(CONTEXT_SIMILARITY_MODEL, backend="onnx")
+            model.save(export_dir)
+            export_dynamic_quantized_onnx_model(model, "avx512_vnni", export_dir)
+            if not os.path.exists(onnx_file):
+                # Left over from an interrupted export
+                shutil.rmtree(onnx_dir, ignore_errors=True)
+                try:
+                    os.replace(export_dir, onnx_dir)
+                except OSError:
+                    # Another process renamed its export into place first
+                    if not os.path.exists(onnx_file):
+                        raise
+        finally:
+            shutil.rmtree(export_dir, ignore_errors=True)
+    # Keeps the SentenceTransformer encode() pipeline, mean pooling included
+    return SentenceTransformer(onnx_dir, backend="onnx", model_kwargs={"file_name": ONNX_INT8_FILE_NAME})
+
+
+def load_context_similarity_model() -> SentenceTransformer:
+    if CONTEXT_SIMILARITY_BACKEND == "onnx-int8":
+        try:
+            return load_onnx_int8_model()
+        except Exception as e:
+            # sentence-transformers reports a missing optimum/onnxruntime as a plain Exception
+            bt.logging.warning(f"ONNX backend not available ({e}) - using PyTorch encoder")
+    model = SentenceTransformer(CONTEXT_SIMILARITY_MODEL)
+    if CONTEXT_SIMILARITY_FP16 and model.device.type == "cuda":
+        # FP16 weights run on tensor cores; scores move by ~1e-3. CPU stays FP32, where half precision is slower
+        model = model.half()
+    if CONTEXT_SIMILARITY_COMPILE and hasattr(torch, "compile"):
+        compile_encoder(model)
+    return model
+
+
+def compile_encoder(model: SentenceTransformer):
+    """Compile the transformer forward in place, so encode() on the same SentenceTransformer uses the graph."""
+    transformer = model[0].auto_model
+    mode = "reduce-overhead" if model.device.type == "cuda" else None
+    # dynamic=True so varying batch and sequence lengths reuse one graph instead of recompiling
+    transformer.forward = torch.compile(transformer.forward, mode=mode, dynamic=True)
+    bt.logging.info(f"VALIDATOR | Compiled context similarity encoder (mode={mode})")
+
+
+def warmup_encoder(model: SentenceTransformer):
+    """Run the first (compiling / autotuning) forwards before any request is timed."""
+    with torch.inference_mode():
+        # One text, then two of different lengths, so both dims are seen as dynamic during warmup
+        model.encode(WARMUP_TEXTS[:1], convert_to_numpy=True, normalize_embeddings=True)
+        model.encode(WARMUP_TEXTS, convert_to_numpy=True, normalize_embeddings=True)
 
 
 class ContextSimilarityValidator:
-    """Singleton validator with batched encoding for better performance."""
+    """Singleton validator; concurrent calls are coalesced into batched encodes by a single worker thread."""
 
     def __init__(self):
-        self.model = SentenceTransformer('sentence-transformers/all-mpnet-base-v2')
-        self.lock = threading.Semaphore(MAX_CONCURRENT_CONTEXT_OPS)
+        self.model = load_context_similarity_model()
+        self.model.eval()
+        warmup_encoder(self.model)
+        # Repeated texts skip the forward pass; concurrent callers share batched encodes
+        self.encoder = BatchedEncoder(self.model, ENCODE_BATCH_SIZE, EMBEDDING_CACHE_SIZE)
+
+    def encode(self, texts):
+        return self.encoder.encode(texts)
 
     def calculate_similarity_score(self, statement: str, excerpt: str):
-        # Batch encode both texts in a single call (much faster than separate calls)
-        with self.lock:
-            embeddings = self.model.encode([statement, excerpt], convert_to_tensor=True, batch_size=2)
-        
-        statement_embedding = embeddings[0:1]
-        excerpt_embedding = embeddings[1:2]
+        # Identical texts encode to identical embeddings, so skip the forward pass
+        if statement.strip() == excerpt.strip():
+            return 1.0
+        # A single vector pair is overhead-bound, so skip torch dispatch and work on the raw float32 arrays
+        embeddings = self.encode([statement, excerpt])
+        return dot_similarity(embeddings[0], embeddings[1])
 
-        return float(util.pytorch_cos_sim(statement_embedding, excerpt_embedding).item())
+    def calculate_similarity_scores(self, statement: str, excerpts: list) -> list:
+        """Score one statement against several excerpts, encoding the statement only once."""
+        embeddings = self.encode([statement, *excerpts])
+        return [
+            1.0 if statement.strip() == excerpt.strip() else dot_similarity(embeddings[0], embedding)
+            for excerpt, embedding in zip(excerpts, embeddings[1:])
+        ]
 
 
-# Single shared validator instance (no pool needed with semaphore)
+# Single shared validator instance; its worker thread batches encodes from concurrent callers
 _validator = ContextSimilarityValidator()
 
 
 def calculate_similarity_score(statement: str, excerpt: str):
     return _validator.calculate_similarity_score(statement, excerpt)
 
+
+def calculate_similarity_scores(statement: str, excerpts: list) -> list:
+    return _validator.calculate_similarity_scores(statement, excerpts)
+
 def main(statement:str, snippet: str):
     result = calculate_similarity_score(statement, snippet)
     print(f"RESULT = {result}")
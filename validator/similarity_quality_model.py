@@ -1,10 +1,17 @@
 import argparse
 import asyncio
 import threading
-from sentence_transformers import SentenceTransformer, util
+from collections import OrderedDict
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+from shared.environment_variables import SIMILARITY_QUALITY_FP16, SIMILARITY_QUALITY_INT8
+from validator.batched_encoder import BatchedEncoder, SIMSIMD_AVAILABLE, simsimd, text_digest
 
 SENTENCE_SIMILARITY_THRESHOLD = 0.95
-MAX_CONCURRENT_SIMILARITY_OPS = 5  # Max concurrent batch encoding operations
+ENCODE_BATCH_SIZE = 64  # Max texts coalesced into one encode() call; ~15 concurrent calls x ~10 chunks keep a GPU busy
+EMBEDDING_CACHE_SIZE = 8192  # Max cached text embeddings
+CONTEXT_CACHE_SIZE = 256  # Max cached per-context chunk embedding matrices
 
 class SimilarityQualityModel:
     """
@@ -23,9 +30,21 @@ class SimilarityQualityModel:
 		A high score indicates a strong semantic match, confirming that the webpage text conveys the same meaning as the snippet.
     """
 
-    def __init__(self):
+    def __init__(self, quantize_int8: bool = SIMILARITY_QUALITY_INT8):
         self.model = SentenceTransformer("all-MiniLM-L6-v2")  # Lightweight transformer
         # self.model = SentenceTransformer('paraphrase-MiniLM-L6-v2')
+        self.model.eval()
+        # FP16 weights run on tensor cores; embeddings still come back as float32 NumPy for scoring
+        self.half_precision = SIMILARITY_QUALITY_FP16 and self.model.device.type == "cuda"
+        if self.half_precision:
+            self.model.half()
+        # int8 embeddings keep ~2 decimals of cosine precision; FP32 stays the default for exact scores
+        self.quantize_int8 = quantize_int8
+        # Repeated texts skip the forward pass; concurrent callers share batched encodes
+        self.encoder = BatchedEncoder(self.model, ENCODE_BATCH_SIZE, EMBEDDING_CACHE_SIZE)
+        # Chunk embedding matrices keyed by the digest of the whole context
+        self.context_cache = OrderedDict()
+        self.context_cache_lock = threading.Lock()
 
     def chunk_text(self, text, window_size=3, step=1):
       """Split text into overlapping chunks of 'window_size' sentences."""
@@ -33,34 +52,114 @@ class SimilarityQualityModel:
       chunks = [" ".join(sentences[i: i + window_size]) for i in range(0, len(sentences), step)]
       return chunks
 
+    def encode(self, texts):
+        return self.encoder.encode(texts)
+
+    def clear_caches(self):
+        """Drop cached text embeddings and context chunk matrices."""
+        self.encoder.clear_cache()
+        with self.context_cache_lock:
+            self.context_cache.clear()
+
+    def _encode_contexts(self, snippets, contexts):
+        """Return (snippet_embeddings, chunk matrix per context), reusing the chunk matrices of seen contexts."""
+        keys = [text_digest(context) for context in contexts]
+        chunk_matrices = [None] * len(contexts)
+        with self.context_cache_lock:
+            for i, key in enumerate(keys):
+                chunk_matrices[i] = self.context_cache.get(key)
+                if chunk_matrices[i] is not None:
+                    self.context_cache.move_to_end(key)
+
+        # Single batched encode call for the snippets and the chunks of every unseen context
+        texts = list(snippets)
+        spans = {}
+        for i, key in enumerate(keys):
+            if chunk_matrices[i] is None and key not in spans:
+                chunks = self.chunk_text(contexts[i], window_size=3)
+                spans[key] = (len(texts), len(texts) + len(chunks))
+                texts.extend(chunks)
+        all_embeddings = self.encode(texts)
+
+        if spans:
+            with self.context_cache_lock:
+                for key, (start, end) in spans.items():
+                    # Own contiguous (chunks, dim) block, so the cache doesn't pin the whole batch matrix
+                    self.context_cache[key] = all_embeddings[start:end].copy()
+                while len(self.context_cache) > CONTEXT_CACHE_SIZE:
+                    self.context_cache.popitem(last=False)
+            for i, key in enumerate(keys):
+                if chunk_matrices[i] is None:
+                    start, end = spans[key]
+                    chunk_matrices[i] = all_embeddings[start:end]
+        return all_embeddings[:len(snippets)], chunk_matrices
+
+    def _is_exact_chunk(self, snippet_text: str, context_text: str) -> bool:
+        """True if the snippet is one of the context's chunks, which scores 1.0 against it."""
+        # The substring test is only a cheap prefilter; the chunk comparison decides
+        snippet = snippet_text.strip()
+        return snippet in context_text and any(
+            chunk.strip() == snippet for chunk in self.chunk_text(context_text, window_size=3)
+        )
+
     def verify_similarity(self, snippet_text: str, context_text: str, similarity_threshold=SENTENCE_SIMILARITY_THRESHOLD) :
-        chunks = self.chunk_text(context_text, window_size=3)
-        
-        # Batch encode all texts in a single call (much faster than separate calls)
-        # First element is snippet, rest are chunks
-        all_texts = [snippet_text] + chunks
-        
-        with model_lock:
-            all_embeddings = self.model.encode(all_texts, convert_to_tensor=True, batch_size=32)
-        
-        snippet_embedding = all_embeddings[0:1]  # Keep as 2D for cos_sim
-        chunk_embeddings = all_embeddings[1:]
-        
-        # Handle edge case where chunks might be empty
-        if len(chunk_embeddings) == 0:
-            return False, 0.0
-        
-        similarities = util.pytorch_cos_sim(snippet_embedding, chunk_embeddings)
-        best_score = similarities.max().item()
-
-        return best_score > similarity_threshold, best_score   # Return best match score and decision
+        # Same path as a batch of one, so single and batched calls always agree
+        return self.verify_similarity_batch([snippet_text], [context_text], similarity_threshold)[0]
+
+    def verify_similarity_batch(self, snippets, contexts, similarity_threshold=SENTENCE_SIMILARITY_THRESHOLD):
+        """Verify many snippet/context pairs with one encode call and one vectorized max over all chunks."""
+        # Pairs whose snippet is one of the chunks skip the forward pass
+        best_scores = np.ones(len(snippets), dtype=np.float64)
+        pending = [i for i, (snippet, context) in enumerate(zip(snippets, contexts)) if not self._is_exact_chunk(snippet, context)]
+        if pending:
+            best_scores[pending] = self._best_scores([snippets[i] for i in pending], [contexts[i] for i in pending])
+        return [(float(score) > similarity_threshold, float(score)) for score in best_scores]
+
+    def _best_scores(self, snippets, contexts):
+        """Best chunk similarity per snippet/context pair; 0.0 for a context without chunks."""
+        # Contexts are checked against many snippets, so after the first call only the snippets are encoded
+        snippet_embeddings, chunk_matrices = self._encode_contexts(snippets, contexts)
+        if self.quantize_int8:
+            return [
+                float(self._int8_similarities(snippet_embeddings[i:i + 1], chunks).max()) if len(chunks) else 0.0
+                for i, chunks in enumerate(chunk_matrices)
+            ]
+
+        counts = np.array([len(chunks) for chunks in chunk_matrices])
+        nonempty = np.flatnonzero(counts)
+        best_scores = np.zeros(len(snippets), dtype=np.float64)
+        if len(nonempty):
+            # Embeddings are normalized at encode time, so cosines are plain dot products.
+            # Pair every chunk row with its snippet row, take all dot products at once, then max per pair
+            chunk_embeddings = np.concatenate([chunk_matrices[i] for i in nonempty])
+            owners = np.repeat(nonempty, counts[nonempty])
+            similarities = np.einsum("ij,ij->i", chunk_embeddings, snippet_embeddings[owners])
+            starts = np.concatenate(([0], np.cumsum(counts[nonempty])[:-1]))
+            best_scores[nonempty] = np.maximum.reduceat(similarities, starts)
+        return best_scores
+
+    @staticmethod
+    def _quantize_int8(embeddings):
+        # Per-vector symmetric scale; cosine is scale invariant so the scales never need undoing
+        scale = 127.0 / np.maximum(np.max(np.abs(embeddings), axis=1, keepdims=True), 1e-12)
+        return np.round(embeddings * scale).astype(np.int8)
+
+    def _int8_similarities(self, snippet_embedding, chunk_embeddings):
+        snippet, chunks = self._quantize_int8(snippet_embedding), self._quantize_int8(chunk_embeddings)
+        if SIMSIMD_AVAILABLE:
+            return 1.0 - np.asarray(simsimd.cdist(snippet, chunks, metric="cosine", dtype="int8"))[0]
+        snippet, chunks = snippet[0].astype(np.int32), chunks.astype(np.int32)
+        norms = np.maximum(np.linalg.norm(chunks, axis=1) * np.linalg.norm(snippet), 1e-8)
+        return (chunks @ snippet) / norms
 
 similarity_quality_model = SimilarityQualityModel()
-model_lock = threading.Semaphore(MAX_CONCURRENT_SIMILARITY_OPS)
 
 async def verify_text_similarity(snippet_text: str, context_text: str, similarity_threshold=SENTENCE_SIMILARITY_THRESHOLD) :
     return await asyncio.to_thread(similarity_quality_model.verify_similarity, snippet_text, context_text, similarity_threshold)
 
+async def verify_text_similarity_batch(snippets, contexts, similarity_threshold=SENTENCE_SIMILARITY_THRESHOLD) :
+    return await asyncio.to_thread(similarity_quality_model.verify_similarity_batch, snippets, contexts, similarity_threshold)
+
 async def main(snippet_text:str, context_text:str):
     score = await verify_text_similarity(snippet_text, context_text)
 
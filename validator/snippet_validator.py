@@ -1,9 +1,11 @@
+import asyncio
 import time
 import bittensor as bt
 import tldextract
 import ipaddress
 import re
 import os
+from functools import lru_cache
 from urllib.parse import urlparse, parse_qs, unquote_plus
 
 from shared.blacklisted_domain_cache import is_blacklisted_domain
@@ -37,6 +39,30 @@ from validator.statement_context_evaluator import assess_statement_async
 from validator.web_page_validator import is_search_web_page
 
 MIN_SNIPPET_CONTEXT_SIMILARITY_SCORE = .65
+DOMAIN_CACHE_SIZE = 4096
+
+# Snippet/page text normalisation patterns, compiled once
+CITATION_MARKER_PATTERN = re.compile(r"\[\s*\d+\s*\]")
+QUOTE_PATTERN = re.compile(r'["“”‘’`´]')
+DASH_PATTERN = re.compile(r'[–—−]')
+PUNCTUATION_PATTERN = re.compile(r"[^\w\s'-]")
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+# Same settings as tldextract.extract (suffix list cached on disk), held once per process
+_tld_extract = tldextract.TLDExtract()
+
+
+@lru_cache(maxsize=DOMAIN_CACHE_SIZE)
+def _registered_domain(hostname: str) -> str:
+    """Return the registered domain of a hostname (IP addresses as-is); deterministic, so results are cached."""
+    try:
+        # Check if it's an IP address
+        ipaddress.ip_address(hostname)
+        return hostname  # Return as-is
+    except ValueError:
+        # It's not an IP, extract the domain
+        ext = _tld_extract(hostname)
+        return f"{ext.domain}.{ext.suffix}" if ext.suffix else ext.domain
 
 class SnippetValidator:
 
@@ -73,15 +99,7 @@ class SnippetValidator:
         if parsed.scheme.lower() != "https":
             raise InsecureProtocolError(url)
 
-        hostname = parsed.hostname
-        try:
-            # Check if it's an IP address
-            ipaddress.ip_address(hostname)
-            return hostname  # Return as-is
-        except ValueError:
-            # It's not an IP, extract the domain
-            ext = tldextract.extract(hostname)
-            return f"{ext.domain}.{ext.suffix}" if ext.suffix else ext.domain
+        return _registered_domain(parsed.hostname)
 
     def _extract_query_string(self, url: str) -> dict:
         parsed = urlparse(url)
@@ -135,17 +153,17 @@ class SnippetValidator:
         try:
             def normalize_text(text):
                 # Remove patterns like [ 1 ], [12], [ 123 ]
-                text = re.sub(r"\[\s*\d+\s*\]", '', text)
+                text = CITATION_MARKER_PATTERN.sub('', text)
                 # Standardize quotes
-                text = re.sub(r'["“”‘’`´]', "'", text)
+                text = QUOTE_PATTERN.sub("'", text)
                 # Standardize dashes
-                text = re.sub(r'[–—−]', '-', text)
+                text = DASH_PATTERN.sub('-', text)
                 # Remove or standardize other punctuation (keep only alphanumerics, spaces, hyphens, and single quotes)
-                text = re.sub(r"[^\w\s'-]", '', text)
+                text = PUNCTUATION_PATTERN.sub('', text)
                 # Convert to lowercase
                 text = text.lower()
                 # Normalize whitespace: replace multiple spaces with a single space, strip leading/trailing
-                text = re.sub(r'\s+', ' ', text).strip()
+                text = WHITESPACE_PATTERN.sub(' ', text).strip()
                 return text
 
             try:
@@ -554,7 +572,7 @@ class SnippetValidator:
                 )
                 return vericore_miner_response
 
-            if is_search_web_page(page_text):
+            if await is_search_web_page(page_text):
                 snippet_score = IS_SEARCH_WEB_PAGE
                 http_secs, selenium_secs, total_secs = _snippet_fetcher_times(http_time_secs, selenium_time_secs)
                 return VericoreStatementResponse(
@@ -688,7 +706,8 @@ class SnippetValidator:
                 )
                 return vericore_miner_response
 
-            context_similarity_score = calculate_similarity_score(
+            context_similarity_score = await asyncio.to_thread(
+                calculate_similarity_score,
                 statement=original_statement.strip(),
                 excerpt=miner_evidence.excerpt
             )
@@ -185,13 +185,14 @@ def distribute_weights_burn_base_remainder(
         List of weights per UID (integers) summing to total_weight
     """
     n_uids = len(moving_scores)
-    weights = [0.0] * n_uids
+    weights = np.zeros(n_uids, dtype=np.float64)
 
     # Burn miner first: constant (burn_perc * total_weight) so they have the most incentives.
     burn_uid = find_target_uid(metagraph, EMISSION_CONTROL_HOTKEY)
-    if burn_uid is not None and burn_uid < n_uids:
+    has_burn_uid = burn_uid is not None and burn_uid < n_uids
+    if has_burn_uid:
         weights[burn_uid] = burn_perc * total_weight
-    remaining_after_burn = total_weight - sum(weights)
+    remaining_after_burn = total_weight - float(weights.sum())
 
     miner_uids = [
         uid for uid in _get_miner_uids(metagraph, banned_hotkeys)
@@ -204,19 +205,18 @@ def distribute_weights_burn_base_remainder(
         bt.logging.warning(
             f"DAEMON | {validator_uid} | No miners to distribute to (all UIDs are validators or banned); giving 100% weight to burn UID"
         )
-        if burn_uid is not None and burn_uid < n_uids:
+        if has_burn_uid:
             weights[burn_uid] = total_weight
         # Example: 5 UIDs, burn_uid=0, UIDs 1-4 validators -> [65535, 0, 0, 0, 0]
-        return [int(round(w)) for w in weights]
+        return np.rint(weights).astype(np.int64).tolist()
 
     # miner_uids excludes burn_uid (see above), so base and remainder go only to miners.
     # Cap base pool by available weight so burn + base never exceeds total_weight.
     base_pool = min(base_fraction * total_weight, remaining_after_burn)
     base_per_miner = base_pool / n_miners
     # Each miner receives base weight (equal share of base pool).
-    for uid in miner_uids:
-        if uid < n_uids:
-            weights[uid] += base_per_miner
+    miner_uids_valid = [uid for uid in miner_uids if uid < n_uids]
+    weights[miner_uids_valid] += base_per_miner
 
     remainder = remaining_after_burn - base_pool
     remainder = max(0.0, remainder)
@@ -224,7 +224,6 @@ def distribute_weights_burn_base_remainder(
     # Use validator's moving_scores (not computed weights) to rank miners for remainder.
     # When miner_counts is provided, break ties by count (more requests = higher rank) so that
     # new/no-request miners don't get top weight when many miners have the same score (e.g. 0).
-    miner_uids_valid = [uid for uid in miner_uids if uid < n_uids]
     if miner_counts is not None and len(miner_counts) >= n_uids:
         # Sort by (score desc, count desc) so same score -> more requests ranks higher.
         uid_score_count = [
@@ -244,26 +243,24 @@ def distribute_weights_burn_base_remainder(
             miner_scores_sorted,
             total_weight=remainder,
         )
-        for i, uid in enumerate(miner_uids_sorted):
-            if i < len(ranking_weights):
-                weights[uid] += ranking_weights[i]
+        n_ranked = min(len(miner_uids_sorted), len(ranking_weights))
+        weights[miner_uids_sorted[:n_ranked]] += np.asarray(ranking_weights[:n_ranked], dtype=np.float64)
 
-    weight_sum = sum(weights)
-    if weight_sum > 0:
-        rounded = [int(round(w)) for w in weights]
-        diff = int(total_weight) - sum(rounded)
+    # np.rint rounds half to even, like round(); back to Python ints only at the boundary
+    rounded = np.rint(weights).astype(np.int64)
+    if weights.sum() > 0:
+        diff = int(total_weight) - int(rounded.sum())
         # Positive diff: add to first miner so burn UID stays exactly burn_perc * total.
         # Negative diff: add to burn UID so we don't push a miner below zero (chain rejects negative weights).
         if diff > 0 and miner_uids_sorted:
             rounded[miner_uids_sorted[0]] += diff
-        elif diff < 0 and burn_uid is not None and burn_uid < n_uids:
+        elif diff < 0 and has_burn_uid:
             rounded[burn_uid] += diff
         elif diff != 0 and miner_uids_sorted:
             rounded[miner_uids_sorted[0]] += diff
-        elif diff != 0 and burn_uid is not None and burn_uid < n_uids:
+        elif diff != 0 and has_burn_uid:
             rounded[burn_uid] += diff
-        return rounded
-    return [int(round(w)) for w in weights]
+    return rounded.tolist()
 
 
 def move_miner_weights(moving_scores, metagraph, my_uid, banned_hotkeys=None, miner_counts=None):
@@ -362,7 +359,12 @@ def send_validator_response_data(
 ):
     if store_response_handler is not None:
         bt.logging.info(f"DAEMON | {validator_uid} | block number: {block_number}")
-        validator_response_data = ValidatorResultsData()
+        validator_response_data = ValidatorResultsData.from_uid_scores(
+            weights=weights,
+            incentives=incentives,
+            scores=moving_scores,
+            validator_uids=validator_uids,
+        )
         validator_response_data.validator_uid = validator_uid
         validator_response_data.validator_hotkey = validator_hotkey
         validator_response_data.block_number = block_number
@@ -370,10 +372,6 @@ def send_validator_response_data(
         validator_response_data.has_summary_data = has_summary_data
         validator_response_data.timestamp = time.time()
         validator_response_data.vericore_responses = vericore_responses
-        validator_response_data.moving_scores = moving_scores
-        validator_response_data.calculated_weights = weights
-        validator_response_data.incentives = incentives
-        validator_response_data.validator_uids = validator_uids or []
         validator_response_data.burn_uid = burn_uid
         store_response_handler.send_json(validator_response_data)
 
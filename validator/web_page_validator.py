@@ -1,4 +1,6 @@
-from validator.context_similarity_validator import calculate_similarity_score
+import asyncio
+
+from validator.context_similarity_validator import calculate_similarity_scores
 
 search_page_text = [
     "You searched for",
@@ -8,12 +10,7 @@ search_page_text = [
     "Showing results for your query"
 ]
 
-def is_search_web_page(web_page: str) -> bool:
-    for search_page in search_page_text:
-        context_similarity_score = calculate_similarity_score(web_page, search_page)
-        if context_similarity_score > 0.7:
-            return True
-
-    return False
-
-
+async def is_search_web_page(web_page: str) -> bool:
+    # Scored off the event loop in one call, so the (long) page is encoded once alongside the phrases
+    context_similarity_scores = await asyncio.to_thread(calculate_similarity_scores, web_page, search_page_text)
+    return any(context_similarity_score > 0.7 for context_similarity_score in context_similarity_scores)